@@ -0,0 +1,174 @@
+"""
+Run a day's solution:
+
+    python -m aoc2020 run --day 7 [--part 2] [--input path/to/input.txt]
+
+optionally profiling each phase and saving the results for comparison:
+
+    python -m aoc2020 run --day 11 --profile --trace-memory --json day11.json
+
+or run a day's slower reference solution instead, where it has one:
+
+    python -m aoc2020 run --day 11 --reference --json day11-reference.json
+
+run every day and part in parallel, with a summary of the answers:
+
+    python -m aoc2020 all [--workers 4] [--timeout 60]
+
+or benchmark how the solvers scale on generated inputs:
+
+    python -m aoc2020 bench [--day 7] [--seed 2020]
+"""
+
+import argparse
+import sys
+from typing import List, Optional
+
+from aoc2020.instrument import Recorder, Span
+from aoc2020.registry import default_input_path, get_solver
+
+
+def format_ms(seconds: float) -> str:
+    return f"{seconds * 1000:10.2f} ms"
+
+
+def print_span(span: Span) -> None:
+    line = f"  {span.name:<8}{format_ms(span.seconds)}"
+    if span.peak_bytes is not None:
+        line += f"  peak {span.peak_bytes} B"
+    print(line)
+
+    for name, amount in sorted(span.counters.items()):
+        print(f"    {name}: {amount}")
+
+    for function in span.profile or []:
+        print(
+            f"    {function.cumulative_seconds * 1000:10.2f} ms"
+            f"  {function.calls:>9}  {function.function}"
+        )
+
+
+def run_day(
+    day: int,
+    part: Optional[int],
+    input_path: Optional[str],
+    recorder: Optional[Recorder] = None,
+    reference: bool = False,
+) -> Recorder:
+    """
+    Run a day as a read, a parse, and a span per part, printing each span
+    as it finishes.
+    """
+    recorder = recorder or Recorder()
+    solver = get_solver(day)
+    all_parts = (solver.reference_parts or {}) if reference else solver.parts
+    if part is not None:
+        parts = [part]
+    elif all_parts:
+        parts = sorted(all_parts)
+    else:
+        raise ValueError(f"No reference solvers for day {day}")
+    input_path = input_path or default_input_path(day)
+
+    print(f"day {day}")
+
+    with recorder.span("startup"):
+        parse = solver.load_parse()
+        solvers = [(p, solver.load_part(p, reference)) for p in parts]
+    print_span(recorder.spans[-1])
+
+    # pulls the file into the page cache, so parse is timed on its own
+    with recorder.span("read"):
+        with open(input_path, "rb") as f:
+            f.read()
+    print_span(recorder.spans[-1])
+
+    with recorder.span("parse"):
+        puzzle_input = parse(input_path)
+    print_span(recorder.spans[-1])
+
+    for p, solve in solvers:
+        with recorder.span(f"part {p}"):
+            answer = solve(puzzle_input)
+        print_span(recorder.spans[-1])
+        print(f"    answer: {answer}")
+
+    for name, per_round in recorder.rounds.items():
+        print(f"  {name} per round: {per_round}")
+
+    return recorder
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m aoc2020")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run a single day")
+    run_parser.add_argument("--day", type=int, required=True)
+    run_parser.add_argument("--part", type=int)
+    run_parser.add_argument("--input", help="defaults to the day's input.txt")
+    run_parser.add_argument(
+        "--profile", action="store_true", help="run each phase under cProfile"
+    )
+    run_parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="record each phase's peak memory with tracemalloc",
+    )
+    run_parser.add_argument("--json", help="write the recorded spans to this file")
+    run_parser.add_argument(
+        "--reference",
+        action="store_true",
+        help="run the day's reference solution, e.g. to count its rounds",
+    )
+
+    all_parser = subparsers.add_parser(
+        "all", help="run every day and part on a process pool"
+    )
+    all_parser.add_argument(
+        "--workers", type=int, help="defaults to the number of cores"
+    )
+    all_parser.add_argument(
+        "--timeout",
+        type=float,
+        default=60.0,
+        help="seconds before a solver is killed",
+    )
+
+    bench_parser = subparsers.add_parser(
+        "bench", help="time the solvers on generated inputs of growing size"
+    )
+    bench_parser.add_argument("--day", type=int)
+    bench_parser.add_argument("--seed", type=int, default=2020)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "all":
+        from aoc2020.runner import run_all
+
+        return 0 if run_all(args.workers, args.timeout) else 1
+
+    if args.command == "bench":
+        # only pay for the generators when benchmarking
+        from aoc2020.benchmark import run_benchmarks
+
+        run_benchmarks(args.day, args.seed)
+        return 0
+
+    recorder = Recorder(profile=args.profile, trace_memory=args.trace_memory)
+    try:
+        run_day(args.day, args.part, args.input, recorder, args.reference)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    if args.json:
+        recorder.write_json(
+            args.json, day=args.day, input=args.input or default_input_path(args.day)
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,403 @@
+"""
+Scaling benchmarks for the day solvers.
+
+Every case has a seeded generator that writes a synthetic puzzle input of a
+given size. The case is parsed with the day's registered parser, then solved
+across a ladder of sizes, recording wall time, peak traced memory, and the
+growth order fitted to the timings.
+
+    python -m aoc2020 bench [--day N] [--seed S]
+"""
+
+import math
+import os
+import random
+import string
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, List, NamedTuple, Optional, Sequence
+
+from aoc2020.registry import get_solver
+
+
+def generate_expenses(size: int, rng: random.Random) -> str:
+    # everything is 1 mod 3, so no three entries can add up to a target
+    # that is also 1 mod 3, and the whole search space gets walked
+    return "\n".join(str(3 * rng.randrange(size * 10) + 1) for _ in range(size))
+
+
+def generate_passwords(size: int, rng: random.Random) -> str:
+    lines = []
+    for _ in range(size):
+        low = rng.randint(1, 10)
+        high = rng.randint(low, 20)
+        letter = rng.choice(string.ascii_lowercase[:5])
+        password = "".join(
+            rng.choice(string.ascii_lowercase[:5]) for _ in range(rng.randint(high, 30))
+        )
+        lines.append(f"{low}-{high} {letter}: {password}")
+    return "\n".join(lines)
+
+
+def generate_slope_map(size: int, rng: random.Random) -> str:
+    return "\n".join(
+        "".join("#" if rng.random() < 0.2 else "." for _ in range(31))
+        for _ in range(size)
+    )
+
+
+def generate_passports(size: int, rng: random.Random) -> str:
+    records = []
+    for _ in range(size):
+        fields = {
+            "byr": str(rng.randint(1920, 2002)),
+            "iyr": str(rng.randint(2010, 2020)),
+            "eyr": str(rng.randint(2020, 2030)),
+            "hgt": f"{rng.randint(150, 193)}cm",
+            "hcl": "#" + "".join(rng.choice("0123456789abcdef") for _ in range(6)),
+            "ecl": rng.choice(["amb", "blu", "brn", "gry", "grn", "hzl", "oth"]),
+            "pid": "".join(rng.choice(string.digits) for _ in range(9)),
+            "cid": str(rng.randint(1, 999)),
+        }
+        if rng.random() < 0.2:
+            del fields[rng.choice(list(fields))]
+
+        pairs = [f"{key}:{value}" for key, value in fields.items()]
+        rng.shuffle(pairs)
+        records.append(
+            "".join(pair + rng.choice(" \n") for pair in pairs[:-1]) + pairs[-1]
+        )
+    return "\n\n".join(records)
+
+
+def seat_sequence(seat_id: int) -> str:
+    bits = f"{seat_id:010b}"
+    row = bits[:7].replace("0", "F").replace("1", "B")
+    col = bits[7:].replace("0", "L").replace("1", "R")
+    return row + col
+
+
+def generate_boarding_passes(size: int, rng: random.Random) -> str:
+    # a contiguous run of seats with a single gap, as the puzzle promises
+    size = min(size, 1000)
+    start = rng.randint(1, 1022 - size)
+    missing = rng.randint(start + 1, start + size - 1)
+    seat_ids = [seat for seat in range(start, start + size + 1) if seat != missing]
+    rng.shuffle(seat_ids)
+    return "\n".join(seat_sequence(seat_id) for seat_id in seat_ids)
+
+
+def generate_customs_answers(size: int, rng: random.Random) -> str:
+    groups = []
+    for _ in range(size):
+        people = [
+            "".join(rng.sample(string.ascii_lowercase, rng.randint(1, 26)))
+            for _ in range(rng.randint(1, 5))
+        ]
+        groups.append("\n".join(people))
+    return "\n\n".join(groups)
+
+
+def generate_bag_rules(size: int, rng: random.Random) -> str:
+    # edges only ever point to the next few colors, so the rules are acyclic
+    # and deep, with shiny gold nested under most of the earlier colors
+    colors = [f"tone{i} hue{i}" for i in range(size)]
+    colors[size // 2] = "shiny gold"
+
+    lines = []
+    for i, color in enumerate(colors):
+        later = range(i + 1, min(size, i + 50))
+        children = rng.sample(later, min(len(later), rng.randint(0, 3)))
+        if children:
+            contents = ", ".join(
+                f"{rng.randint(1, 3)} {colors[child]} bags" for child in children
+            )
+        else:
+            contents = "no other bags"
+        lines.append(f"{color} bags contain {contents}.")
+
+    rng.shuffle(lines)
+    return "\n".join(lines)
+
+
+def generate_console_program(size: int, rng: random.Random) -> str:
+    # forward-only code, with one jmp back to the start to make it loop
+    lines = []
+    for _ in range(size):
+        operation = rng.choice(["acc", "acc", "nop", "jmp"])
+        if operation == "acc":
+            value = rng.randint(-50, 50)
+        else:
+            value = rng.randint(1, 3)
+        lines.append(f"{operation} {value:+d}")
+
+    corrupted = rng.randint(size // 2, size - 1)
+    lines[corrupted] = f"jmp {-corrupted:+d}"
+    return "\n".join(lines)
+
+
+def closest_pair_sum(numbers: Sequence[int], target: int) -> int:
+    """
+    The sum of two different entries of numbers that's closest to target.
+    """
+    ordered = sorted(numbers)
+    low, high = 0, len(ordered) - 1
+    best = ordered[low] + ordered[high]
+    while low < high:
+        pair_sum = ordered[low] + ordered[high]
+        if abs(pair_sum - target) < abs(best - target):
+            best = pair_sum
+        if pair_sum < target:
+            low += 1
+        elif pair_sum > target:
+            high -= 1
+        else:
+            break
+    return best
+
+
+def generate_xmas_stream(size: int, rng: random.Random, window: int = 25) -> str:
+    bound = 10**6
+    numbers = [rng.randint(-bound, bound) for _ in range(window)]
+    while len(numbers) < size - 1:
+        # aim every sum at a fresh random target inside the bound; choosing
+        # the whole pair rather than one side of it keeps the window mixed in
+        # sign, so the stream never drifts off into bigints
+        target = rng.randint(-bound, bound)
+        pair_sum = closest_pair_sum(numbers[-window:], target)
+        if abs(pair_sum) <= bound:
+            numbers.append(pair_sum)
+
+    assert all(abs(number) <= bound for number in numbers)
+
+    # bigger than any two numbers in its preamble can add up to
+    numbers.append(2 * max(abs(number) for number in numbers[-window:]) + 1)
+    return "\n".join(str(number) for number in numbers)
+
+
+def generate_adapters(size: int, rng: random.Random) -> str:
+    adapters = []
+    joltage = 0
+    for _ in range(size):
+        joltage += rng.choice([1, 1, 1, 2, 3])
+        adapters.append(joltage)
+    rng.shuffle(adapters)
+    return "\n".join(str(adapter) for adapter in adapters)
+
+
+def generate_seat_grid(size: int, rng: random.Random) -> str:
+    side = max(1, math.isqrt(size))
+    return "\n".join(
+        "".join("L" if rng.random() < 0.8 else "." for _ in range(side))
+        for _ in range(side)
+    )
+
+
+def generate_navigation(size: int, rng: random.Random) -> str:
+    lines = []
+    for _ in range(size):
+        action = rng.choice("NSEWLRF")
+        if action in "LR":
+            value = rng.choice([90, 180, 270])
+        elif action == "F":
+            value = rng.randint(1, 100)
+        else:
+            value = rng.randint(1, 5)
+        lines.append(f"{action}{value}")
+    return "\n".join(lines)
+
+
+def unreachable_triple_sum(expenses: Sequence[int]) -> Any:
+    from aoc2020.day1.day1 import find_k_sum
+
+    # typical for a triple, but 1 mod 3 like the entries, so never reached
+    target = 3 * sorted(expenses)[len(expenses) // 2] + 1
+    return find_k_sum(expenses, target, 3)
+
+
+def trees_per_slope(slope_map: List[str]) -> Any:
+    from aoc2020.day3.day3 import SLOPES, count_trees
+
+    return [count_trees(slope_map, slope) for slope in SLOPES]
+
+
+def recursive_arrangements(adapters: List[int]) -> Any:
+    from aoc2020.day10.day10 import valid_combinations
+
+    return valid_combinations(adapters)
+
+
+def reference_stable_ferry(ferry: Any) -> Any:
+    from aoc2020.day11.day11 import find_stable_ferry
+
+    return find_stable_ferry(ferry)
+
+
+class BenchCase(NamedTuple):
+    day: int
+    label: str
+    generate: Callable[[int, random.Random], str]
+    sizes: List[int]
+    # solver taking the parsed input, or None to use the registered part
+    solve: Optional[Callable[[Any], Any]] = None
+    part: int = 2
+
+    def load_solve(self) -> Callable[[Any], Any]:
+        if self.solve is not None:
+            return self.solve
+        return get_solver(self.day).load_part(self.part)
+
+
+CASES: List[BenchCase] = [
+    BenchCase(
+        1,
+        "find_k_sum, k=3",
+        generate_expenses,
+        [250, 500, 1000, 2000],
+        solve=unreachable_triple_sum,
+    ),
+    BenchCase(2, "part 2", generate_passwords, [10**3, 10**4, 10**5]),
+    BenchCase(
+        3,
+        "count_trees",
+        generate_slope_map,
+        [10**3, 10**4, 10**5],
+        solve=trees_per_slope,
+    ),
+    BenchCase(3, "count_trees_for_slopes", generate_slope_map, [10**3, 10**4, 10**5]),
+    BenchCase(4, "part 2", generate_passports, [10**3, 10**4, 5 * 10**4]),
+    BenchCase(5, "part 2", generate_boarding_passes, [125, 250, 500, 1000]),
+    BenchCase(6, "part 2", generate_customs_answers, [10**3, 10**4, 10**5]),
+    BenchCase(
+        7, "BagGraph containers", generate_bag_rules, [10**3, 10**4, 10**5], part=1
+    ),
+    BenchCase(7, "BagGraph contents", generate_bag_rules, [10**3, 10**4, 10**5]),
+    BenchCase(8, "fix_corruption", generate_console_program, [10**3, 10**4, 10**5]),
+    BenchCase(9, "part 1", generate_xmas_stream, [10**3, 10**4, 5 * 10**4], part=1),
+    BenchCase(
+        10,
+        "valid_combinations",
+        generate_adapters,
+        [100, 500, 2000, 10**4],
+        solve=recursive_arrangements,
+    ),
+    BenchCase(10, "count_arrangements", generate_adapters, [10**3, 10**4, 10**5]),
+    BenchCase(
+        11,
+        "Ferry.next_round",
+        generate_seat_grid,
+        [100, 400, 1600],
+        solve=reference_stable_ferry,
+    ),
+    BenchCase(11, "stable bitboard", generate_seat_grid, [10**2, 10**3, 10**4, 10**5]),
+    BenchCase(12, "navigate", generate_navigation, [10**3, 10**4, 10**5]),
+]
+
+
+class Measurement(NamedTuple):
+    size: int
+    seconds: Optional[float]
+    peak_bytes: Optional[int]
+    error: Optional[str] = None
+
+
+def parse_generated(case: BenchCase, size: int, seed: int) -> Any:
+    text = case.generate(size, random.Random(seed))
+
+    fd, path = tempfile.mkstemp(suffix=".txt", prefix=f"day{case.day}_")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        return get_solver(case.day).load_parse()(path)
+    finally:
+        os.remove(path)
+
+
+def measure(case: BenchCase, size: int, seed: int) -> Measurement:
+    """
+    Time the solver on its own first, then run it again on a freshly parsed
+    input under tracemalloc, which is too slow to time against.
+    """
+    solve = case.load_solve()
+
+    try:
+        puzzle_input = parse_generated(case, size, seed)
+        start = time.perf_counter()
+        solve(puzzle_input)
+        seconds = time.perf_counter() - start
+
+        puzzle_input = parse_generated(case, size, seed)
+        tracemalloc.start()
+        try:
+            solve(puzzle_input)
+            _, peak_bytes = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    except Exception as e:
+        return Measurement(size, None, None, f"{type(e).__name__}: {e}")
+
+    return Measurement(size, seconds, peak_bytes)
+
+
+def growth_order(measurements: Sequence[Measurement]) -> Optional[float]:
+    """
+    Least-squares slope of log(time) against log(size), so 1.0 is linear
+    and 2.0 quadratic.
+    """
+    points = [
+        (math.log(m.size), math.log(m.seconds))
+        for m in measurements
+        if m.seconds is not None and m.seconds > 0
+    ]
+    if len(points) < 2:
+        return None
+
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    if not spread:
+        return None
+
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread
+
+
+def format_bytes(num_bytes: int) -> str:
+    size = float(num_bytes)
+    for unit in ["B", "KiB", "MiB"]:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def run_case(case: BenchCase, seed: int) -> List[Measurement]:
+    print(f"day {case.day}: {case.label}")
+
+    measurements = []
+    for size in case.sizes:
+        measurement = measure(case, size, seed)
+        measurements.append(measurement)
+
+        if measurement.error is not None:
+            print(f"  {size:>10}  failed: {measurement.error}")
+            # bigger inputs will only fail the same way
+            break
+
+        assert measurement.seconds is not None and measurement.peak_bytes is not None
+        print(
+            f"  {size:>10}  {measurement.seconds * 1000:10.2f} ms"
+            f"  {format_bytes(measurement.peak_bytes):>12}"
+        )
+
+    order = growth_order(measurements)
+    if order is not None:
+        print(f"  growth ~ n^{order:.2f}")
+
+    return measurements
+
+
+def run_benchmarks(day: Optional[int] = None, seed: int = 2020) -> None:
+    for case in CASES:
+        if day is None or case.day == day:
+            run_case(case, seed)
@@ -1,23 +1,127 @@
-from typing import Set, Tuple, cast
-import itertools
+import math
+from typing import List, Sequence, Set, Tuple
+from aoc2020.inputs import chdir_to_module, read_ints
 
-with open("./input.txt") as f:
-    lines = f.read().splitlines()
 
-expenses = [int(line.strip()) for line in lines]
+def _two_sum(
+    sorted_values: Sequence[int], start: int, target: int
+) -> List[Tuple[int, int]]:
+    """
+    Two-pointer scan over sorted_values[start:] for every distinct pair
+    summing to target.
+    """
+    pairs: List[Tuple[int, int]] = []
+    lo = start
+    hi = len(sorted_values) - 1
 
+    while lo < hi:
+        pair_sum = sorted_values[lo] + sorted_values[hi]
+        if pair_sum < target:
+            lo += 1
+        elif pair_sum > target:
+            hi -= 1
+        else:
+            low_value = sorted_values[lo]
+            high_value = sorted_values[hi]
+            pairs.append((low_value, high_value))
 
-options: Set[Tuple[int, int, int]] = set()
+            # skip over duplicates so each combination is only reported once
+            while lo < hi and sorted_values[lo] == low_value:
+                lo += 1
+            while lo < hi and sorted_values[hi] == high_value:
+                hi -= 1
 
-for a, b, c in itertools.permutations(expenses, 3):
-    if a + b + c == 2020:
-        sorted_tuple = cast(Tuple[int, int, int], tuple(sorted([a, b, c])))
-        options.add(sorted_tuple)
+    return pairs
 
-print(options)
 
-assert len(options) == 1
+def _k_sum(
+    sorted_values: Sequence[int], start: int, target: int, k: int
+) -> List[Tuple[int, ...]]:
+    if k == 1:
+        return [(target,)] if target in sorted_values[start:] else []
 
-a, b, c = options.pop()
+    if k == 2:
+        return _two_sum(sorted_values, start, target)
 
-print(a * b * c)
+    combinations: List[Tuple[int, ...]] = []
+    last = len(sorted_values) - k + 1
+
+    for i in range(start, last):
+        value = sorted_values[i]
+
+        if i > start and value == sorted_values[i - 1]:
+            continue
+
+        # the values are sorted, so prune when the smallest or largest
+        # possible sums from here can no longer reach the target
+        if value * k > target and value >= 0:
+            break
+        if value + sum(sorted_values[-(k - 1) :]) < target:
+            continue
+
+        for rest in _k_sum(sorted_values, i + 1, target - value, k - 1):
+            combinations.append((value,) + rest)
+
+    return combinations
+
+
+def find_k_sum(values: Sequence[int], target: int, k: int) -> Set[Tuple[int, ...]]:
+    """
+    Find every distinct combination of k entries from values that sum to target.
+
+    Each entry can be used at most once, but equal values at different
+    positions count as different entries. Combinations are returned as sorted
+    tuples, so the result matches deduplicating itertools.permutations(values, k).
+
+    Runs in O(n^(k - 1)) after an O(n log n) sort.
+    """
+    if k < 1:
+        raise ValueError(f"k must be positive, got {k}")
+
+    sorted_values = sorted(values)
+    if len(sorted_values) < k:
+        return set()
+
+    return set(_k_sum(sorted_values, 0, target, k))
+
+
+assert find_k_sum([1721, 979, 366, 299, 675, 1456], 2020, 2) == {(299, 1721)}
+assert find_k_sum([1721, 979, 366, 299, 675, 1456], 2020, 3) == {(366, 675, 979)}
+assert find_k_sum([1010, 1010], 2020, 2) == {(1010, 1010)}
+assert find_k_sum([1010], 2020, 2) == set()
+assert find_k_sum([1, 1, 2, 2, 3], 5, 3) == {(1, 1, 3), (1, 2, 2)}
+
+
+def expenses_from_file(filename: str) -> Sequence[int]:
+    return read_ints(filename)
+
+
+def product_of_k_sum(expenses: Sequence[int], k: int) -> int:
+    options = find_k_sum(expenses, 2020, k)
+
+    if len(options) != 1:
+        raise ValueError(f"Expected a single combination, found {options}")
+
+    return math.prod(options.pop())
+
+
+def part1(expenses: Sequence[int]) -> int:
+    return product_of_k_sum(expenses, 2)
+
+
+def part2(expenses: Sequence[int]) -> int:
+    return product_of_k_sum(expenses, 3)
+
+
+if __name__ == "__main__":
+    chdir_to_module(__file__)
+
+    expenses = expenses_from_file("./input.txt")
+
+    options = find_k_sum(expenses, 2020, 3)
+
+    print(options)
+
+    assert len(options) == 1
+
+    print(part2(expenses))
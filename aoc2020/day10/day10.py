@@ -1,16 +1,15 @@
-from typing import Dict, List, Set, Tuple
-from collections import defaultdict
+from typing import Deque, Dict, Iterable, List, Set, Tuple
+from collections import defaultdict, deque
 import itertools
 import math
+from aoc2020.inputs import chdir_to_module, read_ints
 
 TOLERANCE = 3
 
 
 def chain_adapters(adapters: List[int]) -> List[int]:
     built_in_adapter = max(adapters) + 3
-    adapters.append(0)
-    adapters.append(built_in_adapter)
-    return sorted(adapters)
+    return sorted([0, *adapters, built_in_adapter])
 
 
 def count_differences(sorted_adapters: List[int]) -> Dict[int, int]:
@@ -31,10 +30,7 @@ def validate_differences(sorted_adapters: List[int]) -> bool:
 
 
 def adapters_for_input_file(file_name: str) -> List[int]:
-    with open(file_name) as f:
-        input_lines = f.read().splitlines()
-
-    return [int(line) for line in input_lines]
+    return list(read_ints(file_name))
 
 
 def diff_dist_for_input_file(file_name: str) -> Dict[int, int]:
@@ -48,6 +44,76 @@ def diff_dist_for_input_file(file_name: str) -> Dict[int, int]:
 # print(diff_dist[1] * diff_dist[3])
 
 
+def joltage_presence(adapters: Iterable[int]) -> bytearray:
+    """
+    Counting sort of the whole chain, without the counts: a byte per
+    joltage, set for the outlet, every adapter, and the device's built-in
+    adapter. Duplicate adapters collapse into one.
+    """
+    adapters = list(adapters)
+    if min(adapters, default=1) < 1:
+        raise ValueError("Adapters need a positive joltage")
+
+    built_in_adapter = max(adapters, default=0) + 3
+    present = bytearray(built_in_adapter + 1)
+    present[0] = present[built_in_adapter] = 1
+    for adapter in adapters:
+        present[adapter] = 1
+
+    return present
+
+
+def sorted_chain(adapters: Iterable[int]) -> List[int]:
+    """
+    The chain_adapters chain in linear time for bounded joltages, except that
+    duplicate adapters collapse into one, where chain_adapters keeps them all.
+    """
+    present = joltage_presence(adapters)
+    return list(itertools.compress(range(len(present)), present))
+
+
+PRESENCE_TO_BINARY = bytes.maketrans(b"\x00\x01", b"01")
+
+
+def presence_bits(present: bytearray) -> int:
+    """
+    The presence bytes packed into an int, bit j set for joltage j.
+    """
+    return int(present.translate(PRESENCE_TO_BINARY)[::-1], 2)
+
+
+def difference_histogram(chain: int, tolerance: int = TOLERANCE) -> Dict[int, int]:
+    """
+    How often each difference up to tolerance occurs between neighbors in a
+    chain of joltages packed as bits.
+
+    A joltage is followed by a gap of d when the bit d above it is set and
+    none of the bits in between are, which is a handful of whole-chain int
+    operations per difference.
+
+    A bit can't be set twice, so unlike count_differences, the gaps of 0
+    between duplicate adapters are never counted.
+    """
+    histogram: Dict[int, int] = {}
+    nothing_closer = -1
+    for difference in range(1, tolerance + 1):
+        above = chain >> difference
+        count = (chain & above & nothing_closer).bit_count()
+        if count:
+            histogram[difference] = count
+        nothing_closer &= ~above
+
+    return histogram
+
+
+def chain_within_tolerance(chain: int, histogram: Dict[int, int]) -> bool:
+    """
+    Whether every neighboring pair in the chain was counted in a histogram
+    from difference_histogram, i.e. no gap is wider than its tolerance.
+    """
+    return sum(histogram.values()) == chain.bit_count() - 1
+
+
 def count_ways(
     adapters: Set[int], current_value: int, cached_calculation: Dict[int, int]
 ):
@@ -56,7 +122,7 @@ def count_ways(
     cached_calculation[current_value] = sum(
         [
             count_ways(adapters, i, cached_calculation)
-            for i in range(current_value + 1, current_value + 4)
+            for i in range(current_value + 1, current_value + TOLERANCE + 1)
             if i in adapters
         ]
     )
@@ -69,7 +135,95 @@ def valid_combinations(adapters: List[int]) -> int:
     return cached_calculation[0]
 
 
-assert valid_combinations(adapters_for_input_file("minimal_input.txt")) == 8
-assert valid_combinations(adapters_for_input_file("medium_input.txt")) == 19208
+def count_arrangements(
+    sorted_adapters: Iterable[int], tolerance: int = TOLERANCE
+) -> int:
+    """
+    Bottom-up version of valid_combinations: walk the adapters in order,
+    keeping only the ones within tolerance of the current adapter, along with
+    the number of ways to reach each of them and the sum of those ways.
+
+    The adapters must already be sorted, e.g. by sorted_chain, which makes
+    this O(n) time and O(tolerance) memory. The outlet and any duplicates
+    are skipped.
+    """
+    # (joltage, ways to reach it) for the adapters within tolerance
+    window: Deque[Tuple[int, int]] = deque([(0, 1)])
+    window_ways = 1
+
+    last_joltage = 0
+    ways = 1
+    for joltage in sorted_adapters:
+        if joltage <= last_joltage:
+            if joltage < last_joltage:
+                raise ValueError(f"Adapters aren't sorted, {joltage} is out of place")
+            # the outlet, or a duplicate adapter
+            continue
+
+        while window and window[0][0] < joltage - tolerance:
+            window_ways -= window.popleft()[1]
+
+        ways = window_ways
+        window.append((joltage, ways))
+        window_ways += ways
+        last_joltage = joltage
+
+    return ways
+
+
+assert count_arrangements(sorted_chain([16, 10, 15, 5, 1, 11, 7, 19, 6, 12, 4])) == 8
+assert count_arrangements([1, 5]) == 0
+assert count_arrangements([1, 2, 3]) == 4
+assert count_arrangements([1, 2, 3], tolerance=1) == 1
+assert count_arrangements([0, 1, 1, 2]) == 2
+
+
+assert sorted_chain([4, 1, 5]) == chain_adapters([4, 1, 5]) == [0, 1, 4, 5, 8]
+assert sorted_chain([1, 1]) == [0, 1, 4]
+assert count_differences(chain_adapters([1, 1])) == {1: 1, 0: 1, 3: 1}
+assert difference_histogram(presence_bits(joltage_presence([1, 1]))) == {1: 1, 3: 1}
+assert difference_histogram(presence_bits(joltage_presence([4, 1, 5]))) == {
+    1: 2,
+    3: 2,
+}
+assert not chain_within_tolerance(
+    presence_bits(joltage_presence([1, 5])),
+    difference_histogram(presence_bits(joltage_presence([1, 5]))),
+)
+
+
+def part1(adapters: List[int]) -> int:
+    chain = presence_bits(joltage_presence(adapters))
+    diff_dist = difference_histogram(chain)
+    if not chain_within_tolerance(chain, diff_dist):
+        raise ValueError(f"Adapters can't be chained within {TOLERANCE} jolts")
+
+    return diff_dist.get(1, 0) * diff_dist.get(3, 0)
+
+
+def part2(adapters: List[int]) -> int:
+    return count_arrangements(sorted_chain(adapters))
+
+
+if __name__ == "__main__":
+    chdir_to_module(__file__)
+
+    for name in ["minimal_input.txt", "medium_input.txt", "input.txt"]:
+        adapters = adapters_for_input_file(name)
+        unchanged = list(adapters)
+        chain = presence_bits(joltage_presence(adapters))
+        assert difference_histogram(chain) == count_differences(
+            chain_adapters(adapters)
+        )
+        assert sorted_chain(adapters) == chain_adapters(adapters)
+        assert adapters == unchanged
+
+    assert valid_combinations(adapters_for_input_file("minimal_input.txt")) == 8
+    assert valid_combinations(adapters_for_input_file("medium_input.txt")) == 19208
+
+    assert part2(adapters_for_input_file("medium_input.txt")) == 19208
+    assert part2(adapters_for_input_file("input.txt")) == (
+        valid_combinations(adapters_for_input_file("input.txt"))
+    )
 
-print(valid_combinations(adapters_for_input_file("input.txt")))
+    print(part2(adapters_for_input_file("input.txt")))
@@ -1,8 +1,23 @@
 from __future__ import annotations
 import attr
+from array import array
+from collections import deque
 from enum import Enum
-
-from typing import List, Tuple, Callable
+import random
+
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+from aoc2020 import instrument
+from aoc2020.inputs import chdir_to_module, read_lines
 
 
 class SeatState(Enum):
@@ -22,17 +37,47 @@ class SeatState(Enum):
             raise NotImplementedError(f"No seat state for {label}")
 
 
+@attr.s(auto_attribs=True, frozen=True)
+class NeighborRule:
+    """
+    Which seats a seat looks at, and how many of them being occupied makes
+    an occupied seat empty out.
+    """
+
+    # look past floor to the first seat in each direction, instead of only
+    # at the eight cells around
+    line_of_sight: bool
+    crowded_at: int
+
+
+ADJACENT_RULE = NeighborRule(line_of_sight=False, crowded_at=4)
+LINE_OF_SIGHT_RULE = NeighborRule(line_of_sight=True, crowded_at=5)
+
+
+def next_seat_state(
+    current_state: SeatState, adjacent_occupied: int, crowded_at: int = 5
+) -> SeatState:
+    if current_state == SeatState.empty:
+        if adjacent_occupied == 0:
+            return SeatState.occupied
+        return SeatState.empty
+    elif current_state == SeatState.occupied:
+        if adjacent_occupied >= crowded_at:
+            return SeatState.empty
+        return SeatState.occupied
+    else:
+        raise NotImplementedError(f"Unclear seat state: {current_state}")
+
+
 @attr.s(auto_attribs=True, frozen=True)
 class Ferry:
     seats: List[List[SeatState]]
+    rule: NeighborRule = LINE_OF_SIGHT_RULE
 
     @classmethod
     def from_input_file(cls, filename: str):
-        with open(filename) as f:
-            input_lines = f.read().splitlines()
-
         seats: List[List[SeatState]] = []
-        for line in input_lines:
+        for line in read_lines(filename):
             row = [SeatState.from_str(char) for char in line.strip()]
             seats.append(row)
 
@@ -55,7 +100,9 @@ class Ferry:
 
         for row in range(num_rows):
             new_seats.append([self.next_value(row, col) for col in range(num_cols)])
-        return Ferry(new_seats)
+
+        instrument.end_round("Ferry.state_of_first_chair")
+        return Ferry(new_seats, self.rule)
 
     def next_value(self, row: int, col: int) -> SeatState:
         """
@@ -64,8 +111,8 @@ class Ferry:
         If a seat is empty (L) and there are no occupied seats adjacent to it,
         the seat becomes occupied.
 
-        If a seat is occupied (#) and four or more seats adjacent to it are
-        also occupied, the seat becomes empty.
+        If a seat is occupied (#) and rule.crowded_at or more seats adjacent
+        to it are also occupied, the seat becomes empty.
 
         Otherwise, the seat's state does not change.
         """
@@ -76,16 +123,7 @@ class Ferry:
 
         adjacent_occupied = self.count_occupied_in_directions(row, col)
 
-        if current_state == SeatState.empty:
-            if adjacent_occupied == 0:
-                return SeatState.occupied
-            return SeatState.empty
-        elif current_state == SeatState.occupied:
-            if adjacent_occupied >= 5:
-                return SeatState.empty
-            return SeatState.occupied
-        else:
-            raise NotImplementedError(f"Unclear seat state: {current_state}")
+        return next_seat_state(current_state, adjacent_occupied, self.rule.crowded_at)
 
     def count_occupied_in_directions(self, row: int, col: int) -> int:
         """
@@ -120,8 +158,12 @@ class Ferry:
         Return the seat state of the first non-floor seat we see,
         or return floor if there are no seats in that direction.
 
+        Without a line of sight, only the next cell over is looked at.
+
         TODO: cache the location of the first chair for a given coord
         """
+        instrument.count("Ferry.state_of_first_chair")
+
         num_rows = len(self.seats)
         num_cols = len(self.seats[0])
         coord_valid = lambda coord: (0 <= coord[0] < num_rows) and (
@@ -132,7 +174,7 @@ class Ferry:
         while coord_valid(new_coord):
             chair_val = self.seats[new_coord[0]][new_coord[1]]
 
-            if chair_val != SeatState.floor:
+            if chair_val != SeatState.floor or not self.rule.line_of_sight:
                 return chair_val
 
             coord = new_coord
@@ -150,17 +192,593 @@ def find_stable_ferry(ferry: Ferry) -> Ferry:
     return ferry
 
 
-# ------------------------------------------------
+DIRECTIONS: List[Tuple[int, int]] = [
+    (1, 0),
+    (1, 1),
+    (1, -1),
+    (0, 1),
+    (0, -1),
+    (-1, 0),
+    (-1, 1),
+    (-1, -1),
+]
+
+
+def shift_towards(cells: int, offset: int, grid_mask: int) -> int:
+    """
+    Move every bit so that bit i ends up holding what bit i + offset held.
+    """
+    if offset >= 0:
+        return cells >> offset
+    return (cells << -offset) & grid_mask
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class SightLine:
+    """
+    Precomputed line of sight in one direction.
+
+    levels holds (distance, see_through) pairs for distances 1, 2, 4, ...
+    where see_through marks cells that start a run of at least `distance`
+    floor cells along the direction, so a whole-grid look-up can skip over
+    runs of floor in log2(longest run) steps.
+    """
+
+    offset: int
+    levels: List[Tuple[int, int]]
+
+
+def at_least(count_bits: List[int], threshold: int) -> int:
+    """
+    Mark the cells whose bit-sliced count, lowest bit first, is at least
+    threshold, comparing the counts a bit at a time from the top.
+    """
+    if threshold >= 1 << len(count_bits):
+        return 0
+
+    at_least_so_far = 0
+    equal_so_far = -1
+    for i in reversed(range(len(count_bits))):
+        if (threshold >> i) & 1:
+            equal_so_far &= count_bits[i]
+        else:
+            at_least_so_far |= equal_so_far & count_bits[i]
+            equal_so_far &= ~count_bits[i]
+
+    return at_least_so_far | equal_so_far
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class BitboardFerry:
+    """
+    A Ferry stored as int bitmasks with one bit per cell.
+
+    Rows are laid out with one extra always-empty column, so stepping off
+    either side of a row lands on a cell that stops the line of sight.
+    Every round is a fixed number of whole-grid int operations.
+
+    Without a line of sight, the sight lines have no levels and only reach
+    the adjacent cell.
+    """
+
+    num_rows: int
+    num_cols: int
+    seats: int
+    occupied: int
+    sight_lines: List[SightLine]
+    rule: NeighborRule = LINE_OF_SIGHT_RULE
+
+    @property
+    def stride(self) -> int:
+        return self.num_cols + 1
+
+    @property
+    def grid_mask(self) -> int:
+        return (1 << (self.num_rows * self.stride)) - 1
+
+    @classmethod
+    def from_ferry(cls, ferry: Ferry) -> BitboardFerry:
+        num_rows = len(ferry.seats)
+        num_cols = len(ferry.seats[0])
+        stride = num_cols + 1
+
+        # build the masks as strings, lowest bit last
+        seat_bits = ["0"] * (num_rows * stride)
+        occupied_bits = ["0"] * (num_rows * stride)
+        floor_bits = ["0"] * (num_rows * stride)
+        for row, line in enumerate(ferry.seats):
+            for col, seat in enumerate(line):
+                bit = row * stride + col
+                if seat == SeatState.floor:
+                    floor_bits[bit] = "1"
+                else:
+                    seat_bits[bit] = "1"
+                    if seat == SeatState.occupied:
+                        occupied_bits[bit] = "1"
+
+        to_int = lambda bits: int("".join(reversed(bits)), 2)
+        floor = to_int(floor_bits)
+        grid_mask = (1 << (num_rows * stride)) - 1
+
+        sight_lines = []
+        for d_row, d_col in DIRECTIONS:
+            offset = d_row * stride + d_col
+
+            levels = []
+            see_through = floor if ferry.rule.line_of_sight else 0
+            distance = 1
+            while see_through:
+                levels.append((distance, see_through))
+                see_through &= shift_towards(see_through, offset * distance, grid_mask)
+                distance *= 2
+
+            sight_lines.append(SightLine(offset, levels))
+
+        return cls(
+            num_rows,
+            num_cols,
+            to_int(seat_bits),
+            to_int(occupied_bits),
+            sight_lines,
+            ferry.rule,
+        )
+
+    @classmethod
+    def from_input_file(cls, filename: str) -> BitboardFerry:
+        return cls.from_ferry(Ferry.from_input_file(filename))
+
+    def to_ferry(self) -> Ferry:
+        num_bits = self.num_rows * self.stride
+        seat_bits = f"{self.seats:0{num_bits}b}"[::-1]
+        occupied_bits = f"{self.occupied:0{num_bits}b}"[::-1]
+
+        seats: List[List[SeatState]] = []
+        for row in range(self.num_rows):
+            start = row * self.stride
+            seats.append(
+                [
+                    (
+                        SeatState.occupied
+                        if occupied_bits[bit] == "1"
+                        else (
+                            SeatState.empty
+                            if seat_bits[bit] == "1"
+                            else SeatState.floor
+                        )
+                    )
+                    for bit in range(start, start + self.num_cols)
+                ]
+            )
+        return Ferry(seats, self.rule)
+
+    @property
+    def num_occupied(self) -> int:
+        return bin(self.occupied).count("1")
+
+    def visible_occupied(self, sight_line: SightLine, grid_mask: int) -> int:
+        """
+        Mark every cell whose first visible seat along sight_line is occupied.
+        """
+        # first, for every cell, is the first seat at or past it occupied?
+        first_occupied = self.occupied
+        for distance, see_through in sight_line.levels:
+            first_occupied |= see_through & shift_towards(
+                first_occupied, sight_line.offset * distance, grid_mask
+            )
+
+        # then look one step over from each cell
+        return shift_towards(first_occupied, sight_line.offset, grid_mask)
+
+    def next_round(self) -> BitboardFerry:
+        """
+        Same rules as Ferry.next_value, applied to every seat at once.
+
+        The per-cell neighbor counts are kept bit-sliced across four ints,
+        added up with a ripple-carry adder per direction.
+        """
+        grid_mask = self.grid_mask
+
+        count_bits = [0, 0, 0, 0]
+        any_visible = 0
+        for sight_line in self.sight_lines:
+            carry = self.visible_occupied(sight_line, grid_mask)
+            any_visible |= carry
+            for i, bits in enumerate(count_bits):
+                count_bits[i] = bits ^ carry
+                carry &= bits
+                if not carry:
+                    break
+
+        crowded = at_least(count_bits, self.rule.crowded_at)
+
+        stays_occupied = self.occupied & ~crowded
+        becomes_occupied = (self.seats ^ self.occupied) & ~any_visible
+
+        instrument.count("BitboardFerry.next_round")
+        return attr.evolve(self, occupied=stays_occupied | becomes_occupied)
+
+
+def find_stable_bitboard_ferry(ferry: BitboardFerry) -> BitboardFerry:
+    next_round = ferry.next_round()
+    while ferry.occupied != next_round.occupied:
+        ferry = next_round
+        next_round = ferry.next_round()
+
+    return ferry
+
+
+def visible_seat_map(
+    seats: List[List[SeatState]], line_of_sight: bool = True
+) -> Dict[Tuple[int, int], List[Tuple[int, int]]]:
+    """
+    Map every seat to the first seat it can see in each direction, or only
+    to its adjacent seats without a line of sight.
+
+    Seeing is symmetric, so this is also the set of seats that can see it.
+    """
+    num_rows = len(seats)
+    num_cols = len(seats[0])
+
+    visible: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+    for row in range(num_rows):
+        for col in range(num_cols):
+            if seats[row][col] == SeatState.floor:
+                continue
+
+            visible[(row, col)] = []
+            for d_row, d_col in DIRECTIONS:
+                r, c = row + d_row, col + d_col
+                while 0 <= r < num_rows and 0 <= c < num_cols:
+                    if seats[r][c] != SeatState.floor:
+                        visible[(row, col)].append((r, c))
+                        break
+                    if not line_of_sight:
+                        break
+                    r, c = r + d_row, c + d_col
+
+    return visible
+
+
+# seeds the per-seat keys, so grid hashes are the same from run to run
+ZOBRIST_SEED = 11
+
+
+def seat_keys(coords: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], int]:
+    """
+    A random 64-bit key per seat, so a grid's hash is the xor of the keys of
+    its occupied seats, and flipping a seat is a single xor.
+    """
+    rng = random.Random(ZOBRIST_SEED)
+    return {coord: rng.getrandbits(64) for coord in coords}
+
+
+@attr.s(auto_attribs=True)
+class FerryStepper:
+    """
+    Step a Ferry forward one round at a time, only re-evaluating the seats
+    that can see a seat which changed in the previous round.
+
+    A seat that just flipped can't flip back unless one of the seats it sees
+    changes too, so once a round changes nothing the dirty set is empty and
+    the ferry is stable.
+
+    grid_hash is kept up to date from the seats that change, see seat_keys.
+    """
+
+    seats: List[List[SeatState]]
+    rule: NeighborRule
+    visible: Dict[Tuple[int, int], List[Tuple[int, int]]]
+    # number of occupied seats visible from each seat
+    occupied_counts: Dict[Tuple[int, int], int]
+    dirty: Set[Tuple[int, int]]
+    keys: Dict[Tuple[int, int], int]
+    grid_hash: int
+    rounds: int = 0
+
+    @classmethod
+    def from_ferry(cls, ferry: Ferry) -> FerryStepper:
+        seats = [list(row) for row in ferry.seats]
+        visible = visible_seat_map(seats, ferry.rule.line_of_sight)
+        occupied_counts = {
+            coord: sum(seats[r][c] == SeatState.occupied for r, c in neighbors)
+            for coord, neighbors in visible.items()
+        }
+        keys = seat_keys(visible)
+        grid_hash = 0
+        for (row, col), key in keys.items():
+            if seats[row][col] == SeatState.occupied:
+                grid_hash ^= key
+
+        return cls(
+            seats, ferry.rule, visible, occupied_counts, set(visible), keys, grid_hash
+        )
+
+    def to_ferry(self) -> Ferry:
+        return Ferry([list(row) for row in self.seats], self.rule)
+
+    @property
+    def is_stable(self) -> bool:
+        return not self.dirty
+
+    def step(self) -> List[Tuple[int, int]]:
+        """
+        Advance one round and return the seats that changed.
+        """
+        crowded_at = self.rule.crowded_at
+        changed = [
+            coord
+            for coord in self.dirty
+            if next_seat_state(
+                self.seats[coord[0]][coord[1]], self.occupied_counts[coord], crowded_at
+            )
+            != self.seats[coord[0]][coord[1]]
+        ]
+
+        dirty: Set[Tuple[int, int]] = set()
+        for row, col in changed:
+            if self.seats[row][col] == SeatState.occupied:
+                self.seats[row][col] = SeatState.empty
+                delta = -1
+            else:
+                self.seats[row][col] = SeatState.occupied
+                delta = 1
+            self.grid_hash ^= self.keys[(row, col)]
+
+            for neighbor in self.visible[(row, col)]:
+                self.occupied_counts[neighbor] += delta
+                dirty.add(neighbor)
+
+        self.dirty = dirty
+        self.rounds += 1
+        return changed
+
+
+@attr.s(auto_attribs=True)
+class HashHistory:
+    """
+    The grid hashes of the last `size` rounds, to spot a state coming back.
+    """
+
+    size: int
+    recent: Deque[Tuple[int, int]] = attr.Factory(deque)
+    # round each hash in recent was last seen at
+    last_seen: Dict[int, int] = attr.Factory(dict)
+
+    def record(self, round_number: int, grid_hash: int) -> Optional[int]:
+        """
+        Remember the hash for a round, returning the period if it's been
+        seen within the history.
+        """
+        seen_at = self.last_seen.get(grid_hash)
+        if seen_at is not None:
+            return round_number - seen_at
+
+        self.recent.append((round_number, grid_hash))
+        self.last_seen[grid_hash] = round_number
+        if len(self.recent) > self.size:
+            old_round, old_hash = self.recent.popleft()
+            if self.last_seen[old_hash] == old_round:
+                del self.last_seen[old_hash]
+        return None
+
+
+class Repeat(NamedTuple):
+    # the grid once it started repeating
+    ferry: Ferry
+    # the round the repeating state was first reached
+    first_round: int
+    # 1 for a stable grid, otherwise the length of the cycle
+    period: int
+
+
+def find_repeat(ferry: Ferry, history_size: int = 64) -> Repeat:
+    """
+    Run the ferry until a grid comes back, in O(changed seats) per round.
+
+    Fixed points are found exactly, from a round changing nothing. Cycles
+    are found from the grid hash, so they need to be no longer than
+    history_size rounds, and trust a 64-bit hash not to collide.
+    """
+    stepper = FerryStepper.from_ferry(ferry)
+    history = HashHistory(history_size)
+    history.record(0, stepper.grid_hash)
+
+    while True:
+        if not stepper.step():
+            return Repeat(stepper.to_ferry(), stepper.rounds - 1, 1)
+
+        period = history.record(stepper.rounds, stepper.grid_hash)
+        if period is not None:
+            return Repeat(stepper.to_ferry(), stepper.rounds - period, period)
+
+
+def find_stable_ferry_incrementally(ferry: Ferry) -> Ferry:
+    repeat = find_repeat(ferry)
+    if repeat.period != 1:
+        raise ValueError(
+            f"Seating cycles every {repeat.period} rounds"
+            f" from round {repeat.first_round}, it never settles."
+        )
+
+    return repeat.ferry
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class SeatGraph:
+    """
+    The seats of a grid, and the seats each one looks at under a
+    NeighborRule, as flat CSR arrays.
+
+    Seats are numbered in reading order with floor left out, and the
+    neighbors of seat i are neighbors[offsets[i] : offsets[i + 1]].
+    """
+
+    num_rows: int
+    num_cols: int
+    # row * num_cols + col of every seat
+    cells: array
+    offsets: array
+    neighbors: array
+
+    @classmethod
+    def from_seats(cls, seats: List[List[SeatState]], rule: NeighborRule) -> SeatGraph:
+        num_rows = len(seats)
+        num_cols = len(seats[0])
+
+        # seat number of every cell, or -1 for floor
+        seat_numbers = array("l", [-1]) * (num_rows * num_cols)
+        cells = array("l")
+        for row, line in enumerate(seats):
+            for col, seat in enumerate(line):
+                if seat != SeatState.floor:
+                    seat_numbers[row * num_cols + col] = len(cells)
+                    cells.append(row * num_cols + col)
+
+        offsets = array("l", [0])
+        neighbors = array("l")
+        for cell in cells:
+            row, col = divmod(cell, num_cols)
+            for d_row, d_col in DIRECTIONS:
+                r, c = row + d_row, col + d_col
+                while 0 <= r < num_rows and 0 <= c < num_cols:
+                    seat_number = seat_numbers[r * num_cols + c]
+                    if seat_number >= 0:
+                        neighbors.append(seat_number)
+                        break
+                    if not rule.line_of_sight:
+                        break
+                    r, c = r + d_row, c + d_col
+            offsets.append(len(neighbors))
+
+        return cls(num_rows, num_cols, cells, offsets, neighbors)
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class CompactFerry:
+    """
+    A Ferry under any NeighborRule, keeping only the seats.
+
+    Each round gathers and counts the occupied neighbors of every seat
+    straight from the SeatGraph, never looking at floor.
+    """
+
+    graph: SeatGraph
+    rule: NeighborRule
+    # 1 for every occupied seat, numbered as in graph.cells
+    occupied: bytes
+
+    @classmethod
+    def from_ferry(cls, ferry: Ferry, rule: NeighborRule) -> CompactFerry:
+        graph = SeatGraph.from_seats(ferry.seats, rule)
+        occupied = bytes(
+            ferry.seats[cell // graph.num_cols][cell % graph.num_cols]
+            == SeatState.occupied
+            for cell in graph.cells
+        )
+        return cls(graph, rule, occupied)
+
+    def to_ferry(self) -> Ferry:
+        num_cols = self.graph.num_cols
+        seats = [[SeatState.floor] * num_cols for _ in range(self.graph.num_rows)]
+        for cell, occupied in zip(self.graph.cells, self.occupied):
+            seats[cell // num_cols][cell % num_cols] = (
+                SeatState.occupied if occupied else SeatState.empty
+            )
+        return Ferry(seats, self.rule)
+
+    @property
+    def num_occupied(self) -> int:
+        return self.occupied.count(1)
+
+    def next_round(self) -> CompactFerry:
+        occupied = self.occupied
+        offsets = self.graph.offsets
+        neighbors = self.graph.neighbors
+        crowded_at = self.rule.crowded_at
+
+        next_occupied = bytearray(len(occupied))
+        start = 0
+        for seat in range(len(occupied)):
+            end = offsets[seat + 1]
+            count = 0
+            for i in range(start, end):
+                count += occupied[neighbors[i]]
+            start = end
+            if occupied[seat]:
+                next_occupied[seat] = count < crowded_at
+            else:
+                next_occupied[seat] = count == 0
+
+        instrument.count("CompactFerry.next_round")
+        return attr.evolve(self, occupied=bytes(next_occupied))
+
+
+def find_stable_compact_ferry(ferry: CompactFerry) -> CompactFerry:
+    next_round = ferry.next_round()
+    while ferry.occupied != next_round.occupied:
+        ferry = next_round
+        next_round = ferry.next_round()
+
+    return ferry
+
+
+def part1(ferry: Ferry) -> int:
+    adjacent = BitboardFerry.from_ferry(attr.evolve(ferry, rule=ADJACENT_RULE))
+    return find_stable_bitboard_ferry(adjacent).num_occupied
+
+
+def part2(ferry: Ferry) -> int:
+    return find_stable_bitboard_ferry(BitboardFerry.from_ferry(ferry)).num_occupied
+
+
+def reference_part1(ferry: Ferry) -> int:
+    return find_stable_ferry(attr.evolve(ferry, rule=ADJACENT_RULE)).num_occupied
+
+
+def reference_part2(ferry: Ferry) -> int:
+    return find_stable_ferry(ferry).num_occupied
+
+
+if __name__ == "__main__":
+    chdir_to_module(__file__)
+
+    test_ferry = Ferry.from_input_file("minimal_input.txt")
+    stable_ferry = find_stable_ferry(test_ferry)
+    assert stable_ferry.num_occupied == 26
+    assert stable_ferry == Ferry.from_input_file("minimal_input_stabilized.txt")
+
+    stable_bitboard = find_stable_bitboard_ferry(BitboardFerry.from_ferry(test_ferry))
+    assert stable_bitboard.num_occupied == 26
+    assert stable_bitboard.to_ferry() == stable_ferry
+
+    assert find_stable_ferry_incrementally(test_ferry) == stable_ferry
+
+    stable_compact = find_stable_compact_ferry(
+        CompactFerry.from_ferry(test_ferry, LINE_OF_SIGHT_RULE)
+    )
+    assert stable_compact.to_ferry() == stable_ferry
 
-test_ferry = Ferry.from_input_file("minimal_input.txt")
-stable_ferry = find_stable_ferry(test_ferry)
-assert stable_ferry.num_occupied == 26
-assert stable_ferry == Ferry.from_input_file("minimal_input_stabilized.txt")
+    adjacent_ferry = attr.evolve(test_ferry, rule=ADJACENT_RULE)
+    assert find_stable_ferry(adjacent_ferry).num_occupied == 37
 
-# ------------------------------------------------
+    stable_adjacent = find_stable_bitboard_ferry(
+        BitboardFerry.from_ferry(adjacent_ferry)
+    )
+    assert stable_adjacent.to_ferry() == find_stable_ferry(adjacent_ferry)
+    assert part1(test_ferry) == 37
+    assert reference_part1(test_ferry) == 37
+    assert reference_part2(test_ferry) == 26
+    stable_compact_adjacent = find_stable_compact_ferry(
+        CompactFerry.from_ferry(test_ferry, ADJACENT_RULE)
+    )
+    assert stable_compact_adjacent.num_occupied == 37
 
+    # a pair of seats that always fill and empty together
+    flickering = Ferry([[SeatState.empty, SeatState.empty]], NeighborRule(False, 1))
+    assert find_repeat(flickering).period == 2
+    assert find_repeat(flickering).first_round == 0
+    assert find_repeat(test_ferry).period == 1
 
-test_ferry = Ferry.from_input_file("input.txt")
-stable_ferry = find_stable_ferry(test_ferry)
+    # ------------------------------------------------
 
-print(stable_ferry.num_occupied)
+    print(part2(Ferry.from_input_file("input.txt")))
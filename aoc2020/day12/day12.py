@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import attr
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from decimal import Decimal
-import math
+import functools
 import re
-from typing import List, Sequence
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, cast
+from aoc2020.inputs import chdir_to_module, read_lines
 
 ACTION_REGEX = re.compile("([NSEWLRF])(\d+)")
 
@@ -28,10 +31,69 @@ class Command:
 
 
 def commands_from_file(filename: str) -> Sequence[Command]:
-    with open(filename) as f:
-        input_lines = f.read().splitlines()
+    return [Command.from_line(line) for line in read_lines(filename)]
 
-    return [Command.from_line(line) for line in input_lines]
+
+# a command as a plain (action, value) pair
+Action = Tuple[str, int]
+
+ACTIONS = set("NSEWLRF")
+
+
+def actions_from_lines(lines: Iterable[str]) -> Iterator[Action]:
+    """
+    Parse command lines without a regex or a Command per line.
+
+    Surrounding whitespace is ignored like Command.from_line ignores what
+    trails the number, but anything else after the number is an error.
+    """
+    for line in lines:
+        line = line.strip()
+        action = line[:1]
+        value = line[1:]
+        if action not in ACTIONS or not value.isdigit():
+            raise ValueError(f"Could not parse line {line}")
+        yield action, int(value)
+
+
+# 2x2 integer matrices, stored row by row as (a, b, c, d)
+Matrix = Tuple[int, int, int, int]
+Vector = Tuple[int, int]
+
+IDENTITY: Matrix = (1, 0, 0, 1)
+
+# counter-clockwise rotations by quarter turns
+QUARTER_TURNS: List[Matrix] = [
+    (1, 0, 0, 1),
+    (0, -1, 1, 0),
+    (-1, 0, 0, -1),
+    (0, 1, -1, 0),
+]
+
+
+def rotation_for_degrees(degrees: int) -> Matrix:
+    """
+    Exact rotation matrix for a counter-clockwise multiple of 90 degrees.
+    """
+    quarter_turns, remainder = divmod(degrees, 90)
+    if remainder:
+        raise ValueError(f"Can only rotate by multiples of 90 degrees, not {degrees}")
+    return QUARTER_TURNS[quarter_turns % 4]
+
+
+def rotate(matrix: Matrix, x: int, y: int) -> Vector:
+    a, b, c, d = matrix
+    return (a * x + b * y, c * x + d * y)
+
+
+def matrix_product(left: Matrix, right: Matrix) -> Matrix:
+    a, b, c, d = left
+    e, f, g, h = right
+    return (a * e + b * g, a * f + b * h, c * e + d * g, c * f + d * h)
+
+
+def matrix_sum(left: Matrix, right: Matrix) -> Matrix:
+    return cast(Matrix, tuple(l + r for l, r in zip(left, right)))
 
 
 @attr.s(auto_attribs=True, frozen=True)
@@ -78,20 +140,218 @@ class Position:
 
     def move_waypoint_around_ship(self, degrees: int) -> Position:
         """
-        TIME FOR SOME TRIG
-
         note: this rotates counter-clockwise
         """
-        radians = math.radians(degrees)
-        x = self.waypoint_horiz
-        y = self.waypoint_vert
-
-        xx = int(x * math.cos(radians)) - int(y * math.sin(radians))
-        yy = int(x * math.sin(radians)) + int(y * math.cos(radians))
+        xx, yy = rotate(
+            rotation_for_degrees(degrees), self.waypoint_horiz, self.waypoint_vert
+        )
 
         return attr.evolve(self, waypoint_horiz=xx, waypoint_vert=yy)
 
 
+# ship then waypoint coordinates, as in Position
+State = Tuple[int, int, int, int]
+
+
+def iter_states(actions: Iterable[Action], position: Position) -> Iterator[State]:
+    """
+    The state after each action, kept in plain ints rather than a Position
+    per step.
+    """
+    horiz = position.horiz
+    vert = position.vert
+    waypoint_horiz = position.waypoint_horiz
+    waypoint_vert = position.waypoint_vert
+
+    for action, value in actions:
+        if action == "N":
+            waypoint_vert += value
+        elif action == "S":
+            waypoint_vert -= value
+        elif action == "E":
+            waypoint_horiz += value
+        elif action == "W":
+            waypoint_horiz -= value
+        elif action == "L" or action == "R":
+            degrees = value if action == "L" else -value
+            waypoint_horiz, waypoint_vert = rotate(
+                rotation_for_degrees(degrees), waypoint_horiz, waypoint_vert
+            )
+        elif action == "F":
+            horiz += value * waypoint_horiz
+            vert += value * waypoint_vert
+        else:
+            raise NotImplementedError(f"todo: {action}{value}")
+
+        yield horiz, vert, waypoint_horiz, waypoint_vert
+
+
+def final_position(actions: Iterable[Action], position: Position) -> Position:
+    state = attr.astuple(position)
+    for state in iter_states(actions, position):
+        pass
+    return Position(*state)
+
+
+def navigate(commands: Iterable[Command], position: Position) -> Position:
+    """
+    Same as repeatedly calling Position.move, but keeping the state in plain
+    ints and only building a Position at the end.
+    """
+    return final_position(
+        ((command.action, command.value) for command in commands), position
+    )
+
+
+def navigate_file(filename: str, position: Position) -> Position:
+    """
+    Navigate straight from a command log, in constant memory however long
+    it is.
+    """
+    return final_position(actions_from_lines(read_lines(filename)), position)
+
+
+class Trajectory:
+    """
+    Every position along a route, with the ship and waypoint coordinates
+    each kept in their own array("q") column. Step 0 is the start, step i
+    the position after the i-th command.
+    """
+
+    def __init__(self, start: Position):
+        self.horiz = array("q", [start.horiz])
+        self.vert = array("q", [start.vert])
+        self.waypoint_horiz = array("q", [start.waypoint_horiz])
+        self.waypoint_vert = array("q", [start.waypoint_vert])
+
+    @classmethod
+    def record(cls, actions: Iterable[Action], start: Position) -> Trajectory:
+        trajectory = cls(start)
+        for horiz, vert, waypoint_horiz, waypoint_vert in iter_states(actions, start):
+            trajectory.horiz.append(horiz)
+            trajectory.vert.append(vert)
+            trajectory.waypoint_horiz.append(waypoint_horiz)
+            trajectory.waypoint_vert.append(waypoint_vert)
+        return trajectory
+
+    def __len__(self) -> int:
+        return len(self.horiz)
+
+    def __getitem__(self, step: int) -> Position:
+        return Position(
+            self.horiz[step],
+            self.vert[step],
+            self.waypoint_horiz[step],
+            self.waypoint_vert[step],
+        )
+
+
+def trajectory_from_file(filename: str, start: Position) -> Trajectory:
+    return Trajectory.record(actions_from_lines(read_lines(filename)), start)
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class Transform:
+    """
+    The effect of a run of commands as an affine map:
+
+        ship' = ship + ship_per_waypoint * waypoint + ship_offset
+        waypoint' = waypoint_rotation * waypoint + waypoint_offset
+
+    Transforms compose associatively, so a long command log can be folded in
+    independent chunks and the chunk transforms combined afterwards.
+    """
+
+    ship_per_waypoint: Matrix = (0, 0, 0, 0)
+    ship_offset: Vector = (0, 0)
+    waypoint_rotation: Matrix = IDENTITY
+    waypoint_offset: Vector = (0, 0)
+
+    @classmethod
+    def from_command(cls, command: Command) -> Transform:
+        action = command.action
+        value = command.value
+
+        if action == "N":
+            return cls(waypoint_offset=(0, value))
+        elif action == "S":
+            return cls(waypoint_offset=(0, -value))
+        elif action == "E":
+            return cls(waypoint_offset=(value, 0))
+        elif action == "W":
+            return cls(waypoint_offset=(-value, 0))
+        elif action == "L":
+            return cls(waypoint_rotation=rotation_for_degrees(value))
+        elif action == "R":
+            return cls(waypoint_rotation=rotation_for_degrees(-value))
+        elif action == "F":
+            return cls(ship_per_waypoint=(value, 0, 0, value))
+        else:
+            raise NotImplementedError(f"todo: {command}")
+
+    def then(self, other: Transform) -> Transform:
+        """
+        The transform that applies self first, then other.
+        """
+        offset_x, offset_y = self.waypoint_offset
+        moved_x, moved_y = rotate(other.ship_per_waypoint, offset_x, offset_y)
+        rotated_x, rotated_y = rotate(other.waypoint_rotation, offset_x, offset_y)
+
+        return Transform(
+            ship_per_waypoint=matrix_sum(
+                self.ship_per_waypoint,
+                matrix_product(other.ship_per_waypoint, self.waypoint_rotation),
+            ),
+            ship_offset=(
+                self.ship_offset[0] + moved_x + other.ship_offset[0],
+                self.ship_offset[1] + moved_y + other.ship_offset[1],
+            ),
+            waypoint_rotation=matrix_product(
+                other.waypoint_rotation, self.waypoint_rotation
+            ),
+            waypoint_offset=(
+                rotated_x + other.waypoint_offset[0],
+                rotated_y + other.waypoint_offset[1],
+            ),
+        )
+
+    def apply(self, position: Position) -> Position:
+        ship_x, ship_y = rotate(
+            self.ship_per_waypoint, position.waypoint_horiz, position.waypoint_vert
+        )
+        waypoint_x, waypoint_y = rotate(
+            self.waypoint_rotation, position.waypoint_horiz, position.waypoint_vert
+        )
+        return Position(
+            position.horiz + ship_x + self.ship_offset[0],
+            position.vert + ship_y + self.ship_offset[1],
+            waypoint_x + self.waypoint_offset[0],
+            waypoint_y + self.waypoint_offset[1],
+        )
+
+
+def compose(transforms: Iterable[Transform]) -> Transform:
+    return functools.reduce(Transform.then, transforms, Transform())
+
+
+def fold_commands(commands: Iterable[Command]) -> Transform:
+    return compose(Transform.from_command(command) for command in commands)
+
+
+def fold_commands_in_parallel(
+    commands: Sequence[Command], chunk_size: int, max_workers: Optional[int] = None
+) -> Transform:
+    """
+    Fold chunks of commands in a process pool, then combine them in order.
+    """
+    chunks = [
+        commands[start : start + chunk_size]
+        for start in range(0, len(commands), chunk_size)
+    ]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return compose(executor.map(fold_commands, chunks))
+
+
 def positions_from_file(filename: str, debug: bool = False) -> List[Position]:
     commands = commands_from_file(filename)
     positions = [Position(0, 0, 10, 1)]
@@ -105,12 +365,28 @@ def positions_from_file(filename: str, debug: bool = False) -> List[Position]:
     return positions
 
 
+def part2(commands: Sequence[Command]) -> int:
+    return navigate(commands, Position(0, 0, 10, 1)).manhattan_distance
+
+
 if __name__ == "__main__":
+    chdir_to_module(__file__)
 
     assert Position(17, 8, 0, 0).manhattan_distance == 25
 
     positions = positions_from_file("minimal_input.txt")
     assert positions[-1].manhattan_distance == 286
 
-    positions = positions_from_file("input.txt", debug=False)
-    print(positions[-1].manhattan_distance)
+    start = Position(0, 0, 10, 1)
+    commands = commands_from_file("minimal_input.txt")
+    assert navigate(commands, start) == positions[-1]
+    assert fold_commands(commands).apply(start) == positions[-1]
+    assert fold_commands_in_parallel(commands, 1).apply(start) == positions[-1]
+    assert navigate_file("minimal_input.txt", start) == positions[-1]
+    assert list(actions_from_lines(["F10 ", " R90"])) == [("F", 10), ("R", 90)]
+
+    trajectory = trajectory_from_file("minimal_input.txt", start)
+    assert [trajectory[step] for step in range(len(trajectory))] == positions
+    assert trajectory[2] == Position(100, 10, 10, 4)
+
+    print(navigate_file("input.txt", start).manhattan_distance)
@@ -1,9 +1,13 @@
 # import attr
 from __future__ import annotations
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
 import re
-from typing import Optional, List
+from typing import Iterator, Optional, List, Set, Tuple
+from aoc2020.inputs import chdir_to_module, read_lines
 
 LINE_REGEX = re.compile("(\d+)-(\d+) ([a-z]): ([a-z]+)")
+# LINE_REGEX at the start of every line, as parse_from_line matches it
+MULTILINE_REGEX = re.compile(r"^[ \t]*(\d+)-(\d+) ([a-z]): ([a-z]+)", re.M)
 
 # @attr.s(auto_attribs=True)
 class PasswordRule:
@@ -52,16 +56,125 @@ class PasswordRule:
 # line = PasswordRule.parse_from_line('1-3 b: bcdefg')
 # print(line.check_validity())
 
-with open("./input.txt") as f:
-    lines = f.read().splitlines()
 
-password_formats: List[PasswordRule] = [
-    PasswordRule.parse_from_line(line.strip()) for line in lines
-]
+def password_rules_from_file(filename: str) -> List[PasswordRule]:
+    return [PasswordRule.parse_from_line(line.strip()) for line in read_lines(filename)]
 
-valid_passwords: List[PasswordRule] = [
-    x.password for x in password_formats if x.check_validity()
-]
-# print(valid_passwords)
 
-print(len(valid_passwords))
+def count_positionally_valid(password_formats: List[PasswordRule]) -> int:
+    valid_passwords: List[str] = [
+        x.password for x in password_formats if x.check_validity()
+    ]
+    # print(valid_passwords)
+
+    return len(valid_passwords)
+
+
+def count_valid_passwords(text: str) -> Tuple[int, int]:
+    """
+    Check every line of text against both policies in a single regex pass.
+
+    Returns how many passwords have between min_repeat and max_repeat of the
+    letter, and how many have the letter in exactly one of the two positions.
+    Raises ValueError on any non-empty line that doesn't parse.
+    """
+    num_count_valid = 0
+    num_position_valid = 0
+    num_lines = 0
+
+    for match in MULTILINE_REGEX.finditer(text):
+        min_repeat, max_repeat, letter, password = match.groups()
+        low = int(min_repeat)
+        high = int(max_repeat)
+        num_lines += 1
+
+        if low <= password.count(letter) <= high:
+            num_count_valid += 1
+        if (password[low - 1] == letter) != (password[high - 1] == letter):
+            num_position_valid += 1
+
+    if num_lines != sum(1 for line in text.splitlines() if line.strip()):
+        # let the line by line parser point out the bad line
+        for line in text.splitlines():
+            if line.strip():
+                PasswordRule.parse_from_line(line.strip())
+        raise ValueError(f"Parsed {num_lines} password lines, expected more")
+
+    return num_count_valid, num_position_valid
+
+
+def iter_line_chunks(filename: str, chunk_size: int) -> Iterator[str]:
+    """
+    Read filename in pieces of about chunk_size characters, always ending a
+    piece at the end of a line.
+    """
+    with open(filename) as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk + f.readline()
+
+
+def count_valid_passwords_in_file(
+    filename: str, workers: int = 0, chunk_size: int = 1 << 24
+) -> Tuple[int, int]:
+    """
+    count_valid_passwords over a file too big to read in one go, optionally
+    with the chunks checked on a process pool.
+    """
+    chunks = iter_line_chunks(filename, chunk_size)
+
+    if workers <= 0:
+        counts = [count_valid_passwords(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            counts = []
+            in_flight: Set[Future] = set()
+            for chunk in chunks:
+                if len(in_flight) >= 2 * workers:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    counts.extend(future.result() for future in done)
+                in_flight.add(executor.submit(count_valid_passwords, chunk))
+            counts.extend(future.result() for future in in_flight)
+
+    return (
+        sum(count_valid for count_valid, _ in counts),
+        sum(position_valid for _, position_valid in counts),
+    )
+
+
+def password_text_from_file(filename: str) -> str:
+    with open(filename) as f:
+        return f.read()
+
+
+def part1(text: str) -> int:
+    return count_valid_passwords(text)[0]
+
+
+def part2(text: str) -> int:
+    return count_valid_passwords(text)[1]
+
+
+if __name__ == "__main__":
+    chdir_to_module(__file__)
+
+    assert count_valid_passwords(password_text_from_file("minimal_input.txt")) == (
+        2,
+        1,
+    )
+    try:
+        count_valid_passwords("1-3 a: abcde\nbogus line\n")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("malformed lines should not be skipped")
+    assert count_valid_passwords_in_file("./input.txt", workers=2, chunk_size=100) == (
+        count_valid_passwords(password_text_from_file("./input.txt"))
+    )
+    assert part2(password_text_from_file("./input.txt")) == (
+        count_positionally_valid(password_rules_from_file("./input.txt"))
+    )
+
+    print(part2(password_text_from_file("./input.txt")))
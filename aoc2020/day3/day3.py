@@ -1,17 +1,20 @@
 import math
+from typing import Iterable, List, Sequence, Tuple
+from aoc2020.inputs import chdir_to_module, read_lines
 
-with open("./input.txt") as f:
-    slope_map = f.read().splitlines()
+SLOPES = [(1, 1), (3, 1), (5, 1), (7, 1), (1, 2)]
 
-width = len(slope_map[0])
-height = len(slope_map)
+
+def slope_map_from_file(filename: str) -> List[str]:
+    return list(read_lines(filename))
 
 
 def next_coords(coords, slope):
     return (coords[0] + slope[0], coords[1] + slope[1])
 
 
-def has_tree(coords):
+def has_tree(slope_map, coords):
+    width = len(slope_map[0])
     x_axis = coords[0] % width
     point = slope_map[coords[1]][x_axis]
     if point == ".":
@@ -22,13 +25,14 @@ def has_tree(coords):
         raise ValueError(point)
 
 
-def count_trees(slope):
+def count_trees(slope_map, slope):
+    height = len(slope_map)
     current_coords = (0, 0)
     num_trees = 0
 
     while current_coords[1] < height:
-        # print(current_coords, has_tree(current_coords))
-        if has_tree(current_coords):
+        # print(current_coords, has_tree(slope_map, current_coords))
+        if has_tree(slope_map, current_coords):
             num_trees += 1
 
         current_coords = next_coords(current_coords, slope)
@@ -36,8 +40,64 @@ def count_trees(slope):
     return num_trees
 
 
-slopes = [(1, 1), (3, 1), (5, 1), (7, 1), (1, 2)]
-trees = [count_trees(slope) for slope in slopes]
+TREE_BITS_TABLE = str.maketrans(".#", "01")
+
+
+def row_bitmask(row: str) -> int:
+    """
+    The trees in a row as an int, with bit x set when there's a tree at x.
+    """
+    return int(row[::-1].translate(TREE_BITS_TABLE), 2)
+
+
+def count_trees_for_slopes(
+    rows: Iterable[str], slopes: Sequence[Tuple[int, int]]
+) -> List[int]:
+    """
+    Count the trees hit on every slope in a single pass over the rows, so the
+    map can be streamed and only one row is held at a time.
+    """
+    trees = [0] * len(slopes)
+
+    for y, row in enumerate(rows):
+        row = row.strip()
+        width = len(row)
+        mask = row_bitmask(row)
+
+        for i, (right, down) in enumerate(slopes):
+            step, off_slope = divmod(y, down)
+            if not off_slope:
+                trees[i] += (mask >> (step * right % width)) & 1
+
+    return trees
+
+
+def count_trees_in_file(filename: str, slopes: Sequence[Tuple[int, int]]) -> List[int]:
+    return count_trees_for_slopes(read_lines(filename), slopes)
+
+
+def part1(slope_map: Sequence[str]) -> int:
+    return count_trees_for_slopes(slope_map, [(3, 1)])[0]
+
+
+def part2(slope_map: Sequence[str]) -> int:
+    return math.prod(count_trees_for_slopes(slope_map, SLOPES))
+
+
+if __name__ == "__main__":
+    chdir_to_module(__file__)
+
+    test_map = slope_map_from_file("minimal_input.txt")
+    assert part1(test_map) == 7
+    assert part2(test_map) == 336
+    assert count_trees_in_file("minimal_input.txt", SLOPES) == [
+        count_trees(test_map, slope) for slope in SLOPES
+    ]
+
+    slope_map = slope_map_from_file("./input.txt")
+
+    trees = count_trees_in_file("./input.txt", SLOPES)
+    assert trees == [count_trees(slope_map, slope) for slope in SLOPES]
 
-print(trees)
-print(math.prod(trees))
+    print(trees)
+    print(math.prod(trees))
@@ -1,11 +1,12 @@
-from typing import Dict
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+import itertools
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 import re
+from aoc2020.inputs import chdir_to_module, read_records
 
 required_keys = {"byr", "iyr", "eyr", "hgt", "hcl", "ecl", "pid"}
 
-with open("./input.txt") as f:
-    passport_batch = f.read().split("\n\n")
-
 
 def parse_record_from_line(batch_line: str) -> Dict[str, str]:
     key_pairs = batch_line.split()
@@ -19,7 +20,6 @@ def parse_record_from_line(batch_line: str) -> Dict[str, str]:
 def check_birth_year(passport_record) -> bool:
     byr = int(passport_record["byr"])
     if not (1920 <= byr <= 2002):
-        print(f"byr invalid: {byr}")
         return False
     return True
 
@@ -27,7 +27,6 @@ def check_birth_year(passport_record) -> bool:
 def check_iyr(passport_record) -> bool:
     iyr = int(passport_record["iyr"])
     if not (2010 <= iyr <= 2020):
-        print(f"iyr invalid: {iyr}")
         return False
     return True
 
@@ -35,7 +34,6 @@ def check_iyr(passport_record) -> bool:
 def check_eyr(passport_record) -> bool:
     eyr = int(passport_record["eyr"])
     if not (2020 <= eyr <= 2030):
-        print(f"eyr invalid: {eyr}")
         return False
     return True
 
@@ -50,11 +48,9 @@ def check_hgt(passport_record) -> bool:
     value, units = match.group(1, 2)
     if units == "in":
         if not (59 <= int(value) <= 76):
-            print(f"hgt invalid: {value}{units}")
             return False
     elif units == "cm":
         if not (150 <= int(value) <= 193):
-            print(f"hgt invalid: {value}{units}")
             return False
     else:
         return False
@@ -68,51 +64,171 @@ HAIR_COLOR_REGEX = re.compile("#[a-f0-9]{6}")
 def check_hcl(passport_record) -> bool:
     match = re.match(HAIR_COLOR_REGEX, passport_record["hcl"])
     if match is None:
-        print(f"hcl invalid: {passport_record['hcl']}")
         return False
     return True
 
 
 def check_ecl(passport_record) -> bool:
     ecl = passport_record["ecl"]
-    valid = ecl in {"amb", "blu", "brn", "gry", "grn", "hzl", "oth"}
-    if not valid:
-        print(f"ecl invalid: {ecl}")
-
-    return valid
+    return ecl in {"amb", "blu", "brn", "gry", "grn", "hzl", "oth"}
 
 
 def check_pid(passport_record) -> bool:
-    valid = len(passport_record["pid"]) == 9
-    if not valid:
-        print(f"pid invalid: {passport_record['pid']}")
+    return len(passport_record["pid"]) == 9
+
+
+# the checks in the order they're applied, named by the field they look at
+CHECKS: List[Tuple[str, Callable[[Dict[str, str]], bool]]] = [
+    ("byr", check_birth_year),
+    ("iyr", check_iyr),
+    ("eyr", check_eyr),
+    ("hgt", check_hgt),
+    ("hcl", check_hcl),
+    ("ecl", check_ecl),
+    ("pid", check_pid),
+]
+
+MISSING_FIELDS = "missing fields"
+
+
+def first_failed_check(passport_record: Dict[str, str]) -> Optional[str]:
+    """
+    Return the name of the first check the record fails, or None if it's valid.
+    """
+    if not required_keys.issubset(passport_record.keys()):
+        return MISSING_FIELDS
 
-    return valid
+    for name, check in CHECKS:
+        if not check(passport_record):
+            return name
+
+    return None
 
 
 def passport_record_is_valid(passport_record: Dict[str, str]) -> bool:
-    included_keys = set(passport_record.keys())
-    if not required_keys.issubset(included_keys):
-        return False
+    return first_failed_check(passport_record) is None
 
-    checks = [
-        check_birth_year,
-        check_iyr,
-        check_eyr,
-        check_hgt,
-        check_hcl,
-        check_ecl,
-        check_pid,
-    ]
-    if all(check(passport_record) for check in checks):
-        return True
 
-    return False
+def passport_records_from_file(filename: str) -> List[Dict[str, str]]:
+    return [parse_record_from_line(record) for record in read_records(filename)]
 
 
-passport_records = [parse_record_from_line(line) for line in passport_batch]
-valid_records = [
-    record for record in passport_records if passport_record_is_valid(record)
-]
+def part1(passport_records: List[Dict[str, str]]) -> int:
+    return sum(required_keys.issubset(record.keys()) for record in passport_records)
+
 
-print(len(valid_records))
+def part2(passport_records: List[Dict[str, str]]) -> int:
+    valid_records = [
+        record for record in passport_records if passport_record_is_valid(record)
+    ]
+    return len(valid_records)
+
+
+def iter_passport_batches(filename: str, chunk_size: int = 1 << 20) -> Iterator[str]:
+    """
+    Yield the text of each record, reading the file chunk_size characters at
+    a time, so memory is bounded by the chunk and the longest record.
+    """
+    with open(filename) as f:
+        pending = ""
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+
+            batches = (pending + chunk).split("\n\n")
+            # the last batch might continue into the next chunk
+            pending = batches.pop()
+            for batch in batches:
+                if batch.strip():
+                    yield batch
+
+        if pending.strip():
+            yield pending
+
+
+def validate_batches(
+    passport_batches: Iterable[str], histogram: bool = False
+) -> Tuple[int, Counter[str]]:
+    """
+    Count the valid records, and if asked, how many records each check
+    rejected.
+    """
+    num_valid = 0
+    rejections: Counter[str] = Counter()
+
+    for batch in passport_batches:
+        failed_check = first_failed_check(parse_record_from_line(batch))
+        if failed_check is None:
+            num_valid += 1
+        elif histogram:
+            rejections[failed_check] += 1
+
+    return num_valid, rejections
+
+
+def shards(items: Iterable[str], shard_size: int) -> Iterator[List[str]]:
+    iterator = iter(items)
+    while True:
+        shard = list(itertools.islice(iterator, shard_size))
+        if not shard:
+            return
+        yield shard
+
+
+def count_valid_passports(
+    filename: str,
+    histogram: bool = False,
+    workers: int = 0,
+    shard_size: int = 10_000,
+    chunk_size: int = 1 << 20,
+) -> Tuple[int, Counter[str]]:
+    """
+    Stream the records from filename and count the valid ones.
+
+    With workers > 0 the records are validated in shards on a process pool,
+    with only a couple of shards per worker in flight at a time so memory
+    stays bounded however big the file is.
+    """
+    batches = iter_passport_batches(filename, chunk_size)
+
+    if workers <= 0:
+        return validate_batches(batches, histogram)
+
+    num_valid = 0
+    rejections: Counter[str] = Counter()
+
+    def collect(done: Iterable[Future]) -> None:
+        nonlocal num_valid
+        for future in done:
+            shard_valid, shard_rejections = future.result()
+            num_valid += shard_valid
+            rejections.update(shard_rejections)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight: Set[Future] = set()
+        for shard in shards(batches, shard_size):
+            if len(in_flight) >= 2 * workers:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+            in_flight.add(executor.submit(validate_batches, shard, histogram))
+
+        collect(in_flight)
+
+    return num_valid, rejections
+
+
+if __name__ == "__main__":
+    chdir_to_module(__file__)
+
+    assert count_valid_passports("minimal_input.txt") == (
+        part2(passport_records_from_file("minimal_input.txt")),
+        Counter(),
+    )
+    assert count_valid_passports("./input.txt", chunk_size=7) == count_valid_passports(
+        "./input.txt", workers=2, shard_size=100
+    )
+
+    num_valid, rejections = count_valid_passports("./input.txt", histogram=True)
+    print(rejections)
+    print(num_valid)
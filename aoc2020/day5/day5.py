@@ -1,7 +1,9 @@
 from __future__ import annotations
 import attr
-from typing import Sequence
+from array import array
+from typing import Iterable, List, Sequence, Set
 import math
+from aoc2020.inputs import chdir_to_module, read_lines
 
 # is this a fancy bit manipulation algorithm?
 
@@ -47,16 +49,87 @@ assert Seat.from_seat_sequence("FFFBBBFRRR") == Seat(14, 7)
 assert Seat.from_seat_sequence("BBFFBBFRLL") == Seat(102, 4)
 
 
-with open("./input.txt") as f:
-    input_lines = f.read().splitlines()
+def seat_ids_from_file(filename: str) -> Set[int]:
+    return {Seat.from_seat_sequence(line).seat_id for line in read_lines(filename)}
 
-avail_seats = set(range(0, Seat(MAX_ROWS, MAX_COLS).seat_id + 1))
-taken_seats = {Seat.from_seat_sequence(line).seat_id for line in input_lines}
-potential_seat_ids = avail_seats - taken_seats
 
-seats_with_occupied_neighbors = set()
-for seat in potential_seat_ids:
-    if not (seat + 1 in potential_seat_ids or seat - 1 in potential_seat_ids):
-        seats_with_occupied_neighbors.add(seat)
+def seats_with_occupied_neighbors(taken_seats: Set[int]) -> Set[int]:
+    avail_seats = set(range(0, Seat(MAX_ROWS, MAX_COLS).seat_id + 1))
+    potential_seat_ids = avail_seats - taken_seats
 
-print(seats_with_occupied_neighbors)
+    seats_with_occupied_neighbors = set()
+    for seat in potential_seat_ids:
+        if not (seat + 1 in potential_seat_ids or seat - 1 in potential_seat_ids):
+            seats_with_occupied_neighbors.add(seat)
+
+    return seats_with_occupied_neighbors
+
+
+NUM_SEATS = Seat(MAX_ROWS, MAX_COLS).seat_id + 1
+
+# a boarding pass is just its seat id written in binary
+SEAT_BITS_TABLE = bytes.maketrans(b"FBLR", b"0101")
+FLAG_BITS_TABLE = bytes.maketrans(b"\x00\x01", b"01")
+
+
+def decode_seat_ids(boarding_passes: bytes) -> array:
+    """
+    Decode a whole manifest of boarding passes at once, without going
+    through a Seat per pass.
+    """
+    binary = boarding_passes.translate(SEAT_BITS_TABLE)
+    return array("H", (int(seat_bits, 2) for seat_bits in binary.split()))
+
+
+def seat_id_array_from_file(filename: str) -> array:
+    with open(filename, "rb") as f:
+        return decode_seat_ids(f.read())
+
+
+def free_seats_between_occupied(taken_seats: Iterable[int]) -> List[int]:
+    """
+    Same as seats_with_occupied_neighbors, using a bitset of the taken seats.
+
+    Seat i is bit i + 1, with the bits either side of the plane set as if
+    they were taken, to match how seats_with_occupied_neighbors treats the
+    ends.
+    """
+    taken = bytearray(NUM_SEATS + 2)
+    taken[0] = taken[-1] = 1
+    for seat_id in taken_seats:
+        taken[seat_id + 1] = 1
+
+    # int() wants the highest bit first
+    occupied = int(taken[::-1].translate(FLAG_BITS_TABLE), 2)
+    free = ((1 << (NUM_SEATS + 2)) - 1) ^ occupied
+
+    candidates = free & (occupied << 1) & (occupied >> 1)
+    bits = f"{candidates:b}"[::-1]
+    return [bit - 1 for bit, value in enumerate(bits) if value == "1"]
+
+
+def part1(taken_seats: Iterable[int]) -> int:
+    return max(taken_seats)
+
+
+def part2(taken_seats: Iterable[int]) -> int:
+    (seat,) = free_seats_between_occupied(taken_seats)
+    return seat
+
+
+if __name__ == "__main__":
+    chdir_to_module(__file__)
+
+    assert list(decode_seat_ids(b"BFFFBBFRRR\nFFFBBBFRRR\nBBFFBBFRLL\n")) == [
+        567,
+        119,
+        820,
+    ]
+    assert free_seats_between_occupied([1, 3, 4, 6]) == [0, 2, 5]
+
+    seat_ids = seat_id_array_from_file("./input.txt")
+    assert set(free_seats_between_occupied(seat_ids)) == (
+        seats_with_occupied_neighbors(seat_ids_from_file("./input.txt"))
+    )
+
+    print(seats_with_occupied_neighbors(seat_ids_from_file("./input.txt")))
@@ -1,7 +1,11 @@
-from typing import Set
+import string
+from typing import Iterable, List, Tuple
+from aoc2020.inputs import chdir_to_module, read_lines
 
-with open("./input.txt") as f:
-    answer_batch = f.read().split("\n\n")
+
+def answer_batches_from_file(filename: str) -> List[str]:
+    with open(filename) as f:
+        return f.read().split("\n\n")
 
 
 def process_answer_batch(batch: str):
@@ -14,5 +18,81 @@ assert process_answer_batch("abc") == 3
 assert process_answer_batch("a\nb\nc") == 0
 assert process_answer_batch("ab\nac") == 1
 
-total_questions = sum(process_answer_batch(batch) for batch in answer_batch)
-print(total_questions)
+
+QUESTION_BITS = {letter: 1 << i for i, letter in enumerate(string.ascii_lowercase)}
+ALL_QUESTIONS = (1 << len(QUESTION_BITS)) - 1
+
+
+def count_answers(lines: Iterable[str]) -> Tuple[int, int]:
+    """
+    Stream through the answers a line at a time, with each person's answers
+    as a 26-bit mask.
+
+    Returns the total over all groups of questions anyone answered, and of
+    questions everyone answered.
+    """
+    anyone_total = 0
+    everyone_total = 0
+
+    anyone = 0
+    everyone = ALL_QUESTIONS
+    in_group = False
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            if in_group:
+                anyone_total += bin(anyone).count("1")
+                everyone_total += bin(everyone).count("1")
+            anyone = 0
+            everyone = ALL_QUESTIONS
+            in_group = False
+            continue
+
+        person = 0
+        for letter in line:
+            person |= QUESTION_BITS[letter]
+
+        anyone |= person
+        everyone &= person
+        in_group = True
+
+    if in_group:
+        anyone_total += bin(anyone).count("1")
+        everyone_total += bin(everyone).count("1")
+
+    return anyone_total, everyone_total
+
+
+assert count_answers(["abc"]) == (3, 3)
+assert count_answers(["a", "b", "c"]) == (3, 0)
+assert count_answers(["ab", "ac", "", "a"]) == (4, 2)
+
+
+def count_answers_in_file(filename: str) -> Tuple[int, int]:
+    return count_answers(read_lines(filename))
+
+
+def answer_lines_from_file(filename: str) -> List[str]:
+    return list(read_lines(filename))
+
+
+def part1(answer_lines: List[str]) -> int:
+    return count_answers(answer_lines)[0]
+
+
+def part2(answer_lines: List[str]) -> int:
+    return count_answers(answer_lines)[1]
+
+
+if __name__ == "__main__":
+    chdir_to_module(__file__)
+
+    assert count_answers_in_file("minimal_input.txt") == (11, 6)
+
+    total_questions = sum(
+        process_answer_batch(batch) for batch in answer_batches_from_file("./input.txt")
+    )
+    assert count_answers_in_file("./input.txt")[1] == total_questions
+
+    print(total_questions)
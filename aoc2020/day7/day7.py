@@ -1,6 +1,11 @@
 from __future__ import annotations
 import attr
-from typing import Set, Dict
+from array import array
+from collections import deque
+import itertools
+import re
+from typing import Dict, FrozenSet, List, Set, Tuple, Union
+from aoc2020.inputs import MappedInput, chdir_to_module, read_lines
 
 
 @attr.s(auto_attribs=True)
@@ -27,19 +32,18 @@ class Rule:
 
 assert Rule.from_string("dotted black bags contain no other bags.").contents == {}
 
-rules_dict: Dict[str, Rule] = {}
 
+def rules_from_file(filename: str) -> Dict[str, Rule]:
+    rules: Dict[str, Rule] = {}
+    for line in read_lines(filename):
+        rule = Rule.from_string(line)
+        rules[rule.color] = rule
 
-with open("./input.txt") as f:
-    input_lines = f.read().splitlines()
+    return rules
 
-for line in input_lines:
-    rule = Rule.from_string(line)
-    rules_dict[rule.color] = rule
 
-
-def can_contain_bag(inner_bag: str, outer_bag: str) -> bool:
-    outer_bag_rule = rules_dict[outer_bag]
+def can_contain_bag(inner_bag: str, outer_bag: str, rules: Dict[str, Rule]) -> bool:
+    outer_bag_rule = rules[outer_bag]
 
     # either it can directly contain the bag
     if inner_bag in outer_bag_rule.contents:
@@ -47,41 +51,335 @@ def can_contain_bag(inner_bag: str, outer_bag: str) -> bool:
 
     # or one of its bags can contain it
     return any(
-        can_contain_bag(inner_bag, sub_outer_bag)
+        can_contain_bag(inner_bag, sub_outer_bag, rules)
         for sub_outer_bag in outer_bag_rule.contents.keys()
     )
 
 
-# assert can_contain_bag("shiny gold", "bright white")
-# assert can_contain_bag("shiny gold", "dark orange")
+# assert can_contain_bag("shiny gold", "bright white", rules)
+# assert can_contain_bag("shiny gold", "dark orange", rules)
 
 
-def bags_can_contain(inner_bag: str) -> Set[str]:
+def bags_can_contain(inner_bag: str, rules: Dict[str, Rule]) -> Set[str]:
     # todo: DP this
     can_contain = set()
-    for outer_bag in rules_dict.keys():
-        if can_contain_bag(inner_bag, outer_bag):
+    for outer_bag in rules.keys():
+        if can_contain_bag(inner_bag, outer_bag, rules):
             can_contain.add(outer_bag)
 
     return can_contain
 
 
-def number_bags_contained(bag_color: str) -> int:
+def number_bags_contained(bag_color: str, rules: Dict[str, Rule]) -> int:
     num_contained = 0
 
-    bag_rule = rules_dict[bag_color]
+    bag_rule = rules[bag_color]
     for sub_bag, number in bag_rule.contents.items():
-        num_contained += number * (1 + number_bags_contained(sub_bag))
+        num_contained += number * (1 + number_bags_contained(sub_bag, rules))
 
     return num_contained
 
 
-# assert number_bags_contained("faded blue") == 0
-# assert number_bags_contained("dark olive") == 7
-# assert number_bags_contained("shiny gold") == 32
+@attr.s(auto_attribs=True)
+class RuleGraph:
+    """
+    The bag rules as a graph, with edges pointing from each bag to the bags
+    it directly contains, plus the reverse edges.
+
+    Answers are memoized, so asking about every color costs the same as
+    walking the graph once.
+    """
+
+    # mapping from color to {contained color: number}
+    contents: Dict[str, Dict[str, int]]
+    # mapping from color to the colors that directly contain it
+    contained_by: Dict[str, Set[str]]
+    _containers: Dict[str, FrozenSet[str]] = attr.Factory(dict)
+    _total_contents: Dict[str, int] = attr.Factory(dict)
+
+    @classmethod
+    def from_rules(cls, rules: Dict[str, Rule]) -> RuleGraph:
+        contents = {color: dict(rule.contents) for color, rule in rules.items()}
+        contained_by: Dict[str, Set[str]] = {color: set() for color in contents}
+
+        for color, children in contents.items():
+            for child in children:
+                contents.setdefault(child, {})
+                contained_by.setdefault(child, set()).add(color)
+
+        return cls(contents, contained_by)
+
+    def topological_order(self) -> List[str]:
+        """
+        Order the colors so every bag comes before the bags it contains.
+        """
+        num_parents = {
+            color: len(parents) for color, parents in self.contained_by.items()
+        }
+        queue = deque(color for color, count in num_parents.items() if count == 0)
+
+        order: List[str] = []
+        while queue:
+            color = queue.popleft()
+            order.append(color)
+            for child in self.contents[color]:
+                num_parents[child] -= 1
+                if num_parents[child] == 0:
+                    queue.append(child)
+
+        if len(order) != len(self.contents):
+            raise ValueError("Bag rules contain a cycle")
+
+        return order
+
+    def containers(self, inner_bag: str) -> FrozenSet[str]:
+        """
+        Every color that can eventually contain inner_bag, frozen since the
+        answer is shared with the memo.
+        """
+        if inner_bag in self._containers:
+            return self._containers[inner_bag]
+
+        seen: Set[str] = set()
+        queue = deque(self.contained_by.get(inner_bag, ()))
+        while queue:
+            color = queue.popleft()
+            if color in seen:
+                continue
+            seen.add(color)
+
+            if color in self._containers:
+                seen |= self._containers[color]
+            else:
+                queue.extend(self.contained_by[color])
+
+        self._containers[inner_bag] = frozenset(seen)
+        return self._containers[inner_bag]
+
+    def total_contents(self, bag_color: str) -> int:
+        """
+        How many bags end up inside a single bag_color bag.
+        """
+        if not self._total_contents:
+            self._total_contents = self.all_total_contents()
+        return self._total_contents[bag_color]
+
+    def all_total_contents(self) -> Dict[str, int]:
+        """
+        Count the bags inside every color at once, children first.
+        """
+        totals: Dict[str, int] = {}
+        for color in reversed(self.topological_order()):
+            totals[color] = sum(
+                number * (1 + totals[child])
+                for child, number in self.contents[color].items()
+            )
+        return totals
+
+
+# every bag mentioned in a rule: the outer bag has no number in front of it,
+# the bags inside it always do
+BAG_REGEX = re.compile(rb"(?:(\d+) )?(\w+ \w+) bags?")
+NO_OTHER_BAGS = b"no other"
+
+
+def to_csr(
+    num_nodes: int, sources: array, targets: array, weights: array
+) -> Tuple[array, array, array]:
+    """
+    Counting sort a list of edges by source into CSR form: the edges out of
+    node i are targets[offsets[i] : offsets[i + 1]], weighted the same.
+    """
+    offsets = array("q", bytes(8 * (num_nodes + 1)))
+    for source in sources:
+        offsets[source + 1] += 1
+    offsets = array("q", itertools.accumulate(offsets))
+
+    next_slot = offsets[:-1]
+    sorted_targets = array(targets.typecode, bytes(targets.itemsize * len(targets)))
+    sorted_weights = array(weights.typecode, bytes(weights.itemsize * len(weights)))
+    for source, target, weight in zip(sources, targets, weights):
+        slot = next_slot[source]
+        sorted_targets[slot] = target
+        sorted_weights[slot] = weight
+        next_slot[source] = slot + 1
+
+    return offsets, sorted_targets, sorted_weights
+
+
+@attr.s(auto_attribs=True)
+class BagGraph:
+    """
+    The bag rules with every color interned to a dense integer id, and the
+    edges stored as flat CSR arrays: bag i directly holds counts[j] bags of
+    color children[j] for j in range(offsets[i], offsets[i + 1]).
+
+    The reverse edges, used to find containers, are built on first use.
+    """
+
+    colors: List[str]
+    ids: Dict[str, int]
+    offsets: array
+    children: array
+    counts: array
+    _parent_offsets: array = attr.Factory(lambda: array("q"))
+    _parents: array = attr.Factory(lambda: array("i"))
+    _totals: List[int] = attr.Factory(list)
+
+    @classmethod
+    def from_bytes(cls, data: Union[bytes, memoryview]) -> BagGraph:
+        """
+        Parse the rules with a single pass of BAG_REGEX over the raw text.
+        """
+        ids: Dict[str, int] = {}
+        sources = array("i")
+        targets = array("i")
+        weights = array("i")
+
+        outer = -1
+        for match in BAG_REGEX.finditer(data):
+            number, color_bytes = match.groups()
+            if number is None and color_bytes == NO_OTHER_BAGS:
+                continue
+
+            color = color_bytes.decode()
+            color_id = ids.setdefault(color, len(ids))
+            if number is None:
+                outer = color_id
+            else:
+                sources.append(outer)
+                targets.append(color_id)
+                weights.append(int(number))
+
+        offsets, children, counts = to_csr(len(ids), sources, targets, weights)
+        return cls(list(ids), ids, offsets, children, counts)
+
+    @classmethod
+    def from_file(cls, filename: str) -> BagGraph:
+        with MappedInput(filename) as puzzle_input:
+            return cls.from_bytes(puzzle_input.raw())
+
+    def __len__(self) -> int:
+        return len(self.colors)
+
+    def topological_order(self) -> List[int]:
+        """
+        Order the bag ids so every bag comes before the bags it contains.
+        """
+        offsets = self.offsets
+        children = self.children
+
+        num_parents = array("q", bytes(8 * len(self)))
+        for child in children:
+            num_parents[child] += 1
+        queue = deque(bag for bag, count in enumerate(num_parents) if count == 0)
+
+        order: List[int] = []
+        while queue:
+            bag = queue.popleft()
+            order.append(bag)
+            for child in children[offsets[bag] : offsets[bag + 1]]:
+                num_parents[child] -= 1
+                if num_parents[child] == 0:
+                    queue.append(child)
+
+        if len(order) != len(self):
+            raise ValueError("Bag rules contain a cycle")
+
+        return order
+
+    def containers(self, inner_bag: str) -> Set[str]:
+        """
+        Every color that can eventually contain inner_bag.
+        """
+        if not self._parent_offsets:
+            sources = array("i")
+            for bag, (start, end) in enumerate(itertools.pairwise(self.offsets)):
+                sources.extend(itertools.repeat(bag, end - start))
+            self._parent_offsets, self._parents, _ = to_csr(
+                len(self), self.children, sources, self.counts
+            )
+
+        parent_offsets = self._parent_offsets
+        parents = self._parents
+
+        seen = bytearray(len(self))
+        stack = [self.ids[inner_bag]] if inner_bag in self.ids else []
+        while stack:
+            bag = stack.pop()
+            for parent in parents[parent_offsets[bag] : parent_offsets[bag + 1]]:
+                if not seen[parent]:
+                    seen[parent] = 1
+                    stack.append(parent)
+
+        return set(itertools.compress(self.colors, seen))
+
+    def total_contents(self, bag_color: str) -> int:
+        """
+        How many bags end up inside a single bag_color bag.
+        """
+        if not self._totals:
+            offsets = self.offsets
+            children = self.children
+            counts = self.counts
+
+            totals = [0] * len(self)
+            for bag in reversed(self.topological_order()):
+                start, end = offsets[bag], offsets[bag + 1]
+                totals[bag] = sum(
+                    count * (1 + totals[child])
+                    for child, count in zip(children[start:end], counts[start:end])
+                )
+            self._totals = totals
+
+        return self._totals[self.ids[bag_color]]
+
+
+def rule_graph_from_file(filename: str) -> RuleGraph:
+    return RuleGraph.from_rules(rules_from_file(filename))
+
+
+def part1(bag_graph: BagGraph) -> int:
+    return len(bag_graph.containers("shiny gold"))
+
+
+def part2(bag_graph: BagGraph) -> int:
+    return bag_graph.total_contents("shiny gold")
+
+
+if __name__ == "__main__":
+    chdir_to_module(__file__)
+
+    test_graph = rule_graph_from_file("minimal_input.txt")
+    assert test_graph.containers("shiny gold") == {
+        "bright white",
+        "muted yellow",
+        "dark orange",
+        "light red",
+    }
+    assert test_graph.total_contents("faded blue") == 0
+    assert test_graph.total_contents("dark olive") == 7
+    assert test_graph.total_contents("shiny gold") == 32
+
+    test_graph = rule_graph_from_file("minimal_input2.txt")
+    assert test_graph.total_contents("shiny gold") == 126
+
+    test_bags = BagGraph.from_file("minimal_input.txt")
+    assert len(test_bags) == 9
+    assert test_bags.containers("shiny gold") == {
+        "bright white",
+        "muted yellow",
+        "dark orange",
+        "light red",
+    }
+    assert test_bags.total_contents("dark olive") == 7
+    assert test_bags.total_contents("shiny gold") == 32
+    assert BagGraph.from_file("minimal_input2.txt").total_contents("shiny gold") == 126
 
-# assert number_bags_contained("shiny gold") == 126
+    rule_graph = rule_graph_from_file("./input.txt")
+    bag_graph = BagGraph.from_file("./input.txt")
+    assert bag_graph.containers("shiny gold") == rule_graph.containers("shiny gold")
 
-print(number_bags_contained("shiny gold"))
+    print(part2(bag_graph))
 
-# print(len(bags_can_contain("shiny gold")))
+    # print(part1(rule_graph))
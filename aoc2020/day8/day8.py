@@ -1,5 +1,8 @@
 import attr
-from typing import List
+from array import array
+from typing import Callable, List, Optional, Tuple
+from aoc2020 import instrument
+from aoc2020.inputs import chdir_to_module, read_lines
 
 
 @attr.s(auto_attribs=True, frozen=True)
@@ -13,35 +16,144 @@ class InfiniteLoopException(Exception):
     pass
 
 
-def execute_instructions(instructions: List[Instruction], debug: bool = False) -> int:
-    visited_instructions = set()
-    accumulator = 0
+NOP, ACC, JMP = range(3)
+OPERATIONS = ["nop", "acc", "jmp"]
+OPCODES = {operation: opcode for opcode, operation in enumerate(OPERATIONS)}
 
-    pc = 0
-    step = 0
 
-    while pc < len(instructions):
-        step += 1
-        inst = instructions[pc]
-        if debug:
-            print(f"instruction: {inst} pc: {pc} step: {step} acc: {accumulator}")
+@attr.s(auto_attribs=True)
+class Program:
+    """
+    Instructions compiled into parallel arrays, indexed by line.
+    """
 
-        if inst in visited_instructions:
-            raise InfiniteLoopException(f"Visited instruction a second time! Breaking.")
+    opcodes: bytearray
+    operands: array
 
-        visited_instructions.add(inst)
+    @classmethod
+    def compile(cls, instructions: List[Instruction]) -> "Program":
+        opcodes = bytearray(len(instructions))
+        operands = array("q", bytes(8 * len(instructions)))
+        for pc, inst in enumerate(instructions):
+            if inst.operation not in OPCODES:
+                raise ValueError(f"Invalid instruction: {inst.operation}")
+            opcodes[pc] = OPCODES[inst.operation]
+            operands[pc] = inst.value
 
-        if inst.operation == "nop":
-            pc += 1
-        elif inst.operation == "acc":
-            accumulator += inst.value
-            pc += 1
-        elif inst.operation == "jmp":
-            pc += inst.value
-        else:
-            raise ValueError(f"Invalid instruction: {inst.operation}")
+        return cls(opcodes, operands)
+
+    def __len__(self) -> int:
+        return len(self.opcodes)
+
+
+# called with pc, opcode, operand and accumulator before each instruction runs
+Tracer = Callable[[int, int, int, int], None]
+
+
+def print_trace(pc: int, opcode: int, operand: int, accumulator: int) -> None:
+    print(f"pc: {pc} instruction: {OPERATIONS[opcode]} {operand:+d} acc: {accumulator}")
+
+
+@attr.s(auto_attribs=True)
+class Console:
+    """
+    Runs a Program, either an instruction at a time with step() or all the
+    way with run(). Revisiting an instruction raises InfiniteLoopException,
+    leaving the state as it was just before the repeat.
+
+    Without a tracer, run() is a single tight loop over the arrays.
+    """
+
+    program: Program
+    trace: Optional[Tracer] = None
+    pc: int = 0
+    accumulator: int = 0
+    steps: int = 0
+    visited: bytearray = attr.Factory(
+        lambda self: bytearray(len(self.program)), takes_self=True
+    )
+
+    @property
+    def terminated(self) -> bool:
+        return self.pc >= len(self.program)
+
+    def step(self) -> bool:
+        """
+        Run the next instruction, or return False if the program has ended.
+        """
+        pc = self.pc
+        if pc >= len(self.program):
+            return False
+        if pc < 0:
+            raise InfiniteLoopException("Jumped before the start of the program.")
+        if self.visited[pc]:
+            raise InfiniteLoopException(f"Visited instruction {pc} a second time!")
+        self.visited[pc] = 1
+
+        opcode = self.program.opcodes[pc]
+        operand = self.program.operands[pc]
+        if self.trace is not None:
+            self.trace(pc, opcode, operand, self.accumulator)
 
-    return accumulator
+        if opcode == ACC:
+            self.accumulator += operand
+        self.pc = pc + operand if opcode == JMP else pc + 1
+        self.steps += 1
+        return True
+
+    def run(self) -> int:
+        """
+        Run until the program ends, returning the accumulator.
+        """
+        steps_at_entry = self.steps
+        if self.trace is not None:
+            try:
+                while self.step():
+                    pass
+            finally:
+                instrument.count("Console.run steps", self.steps - steps_at_entry)
+            return self.accumulator
+
+        opcodes = self.program.opcodes
+        operands = self.program.operands
+        visited = self.visited
+        num_instructions = len(opcodes)
+        pc = self.pc
+        accumulator = self.accumulator
+        steps = self.steps
+
+        try:
+            while 0 <= pc < num_instructions:
+                if visited[pc]:
+                    raise InfiniteLoopException(
+                        f"Visited instruction {pc} a second time!"
+                    )
+                visited[pc] = 1
+                steps += 1
+
+                opcode = opcodes[pc]
+                if opcode == ACC:
+                    accumulator += operands[pc]
+                    pc += 1
+                elif opcode == JMP:
+                    pc += operands[pc]
+                else:
+                    pc += 1
+        finally:
+            self.pc = pc
+            self.accumulator = accumulator
+            self.steps = steps
+            instrument.count("Console.run steps", steps - steps_at_entry)
+
+        if pc < 0:
+            raise InfiniteLoopException("Jumped before the start of the program.")
+
+        return accumulator
+
+
+def execute_instructions(instructions: List[Instruction], debug: bool = False) -> int:
+    console = Console(Program.compile(instructions), print_trace if debug else None)
+    return console.run()
 
 
 def parse_instruction(line: str, line_no: int) -> Instruction:
@@ -50,28 +162,162 @@ def parse_instruction(line: str, line_no: int) -> Instruction:
 
 
 def brute_force_fix_corruption(instructions: List[Instruction]) -> None:
-    for i, inst in enumerate(instructions):
-        if inst.operation == "nop":
+    program = Program.compile(instructions)
+    for i, opcode in enumerate(program.opcodes):
+        if opcode == ACC:
             continue
 
-        trial = instructions.copy()
-        new_op = "nop"
-        if inst.operation == "nop":
-            new_op = "jmp"
-        trial[i] = Instruction(i, new_op, inst.value)
-
+        # flip the instruction in place, and put it back after the trial
+        program.opcodes[i] = NOP if opcode == JMP else JMP
         try:
-            acc_value = execute_instructions(trial)
+            acc_value = Console(program).run()
         except InfiniteLoopException:
             continue
         else:
             print(f"We're done! changed_inst: {i} acc: {acc_value}")
             break
+        finally:
+            program.opcodes[i] = opcode
+
+
+def next_pc(pc: int, operation: str, value: int) -> int:
+    if operation == "jmp":
+        return pc + value
+    return pc + 1
+
+
+def instructions_reaching_end(instructions: List[Instruction]) -> List[bool]:
+    """
+    For every instruction, does running from it eventually step past the end
+    of the program?
+
+    Walks the reversed control-flow graph back from the end, so every
+    instruction is visited once.
+    """
+    num_instructions = len(instructions)
+
+    # comes_from[pc] lists the instructions that step straight to pc, with
+    # every jump past the end collected on the extra slot at num_instructions
+    comes_from: List[List[int]] = [[] for _ in range(num_instructions + 1)]
+    for pc, inst in enumerate(instructions):
+        target = next_pc(pc, inst.operation, inst.value)
+        if target >= num_instructions:
+            comes_from[num_instructions].append(pc)
+        elif target >= 0:
+            comes_from[target].append(pc)
 
+    reaches_end = [False] * num_instructions
+    stack = list(comes_from[num_instructions])
+    while stack:
+        pc = stack.pop()
+        if reaches_end[pc]:
+            continue
+        reaches_end[pc] = True
+        stack.extend(comes_from[pc])
+
+    return reaches_end
+
+
+FLIPPED_OPERATION = {"jmp": "nop", "nop": "jmp"}
+
+
+def fix_corruption(instructions: List[Instruction]) -> Tuple[int, int]:
+    """
+    Find the single jmp <-> nop flip that lets the program terminate.
+
+    Runs the program once, and flips the first instruction on its path whose
+    flipped target is known to reach the end. Once flipped, the rest of the
+    run is guaranteed to terminate.
+
+    Returns the line of the flipped instruction and the final accumulator.
+    """
+    num_instructions = len(instructions)
+    reaches_end = instructions_reaching_end(instructions)
+
+    visited = [False] * num_instructions
+    accumulator = 0
+    flipped = None
+
+    pc = 0
+    while 0 <= pc < num_instructions:
+        if visited[pc]:
+            raise InfiniteLoopException("No single flip fixes the program.")
+        visited[pc] = True
+
+        inst = instructions[pc]
+        operation = inst.operation
+
+        if flipped is None and operation in FLIPPED_OPERATION:
+            target = next_pc(pc, FLIPPED_OPERATION[operation], inst.value)
+            if target >= num_instructions or (0 <= target and reaches_end[target]):
+                flipped = pc
+                operation = FLIPPED_OPERATION[operation]
+
+        if operation == "acc":
+            accumulator += inst.value
+        elif operation not in FLIPPED_OPERATION:
+            raise ValueError(f"Invalid instruction: {operation}")
+
+        pc = next_pc(pc, operation, inst.value)
+
+    if pc < 0:
+        raise InfiniteLoopException("Jumped before the start of the program.")
+
+    if flipped is None:
+        raise ValueError("Program already terminates, nothing to fix.")
+
+    return flipped, accumulator
+
+
+def instructions_from_file(filename: str) -> List[Instruction]:
+    return [parse_instruction(line, i) for i, line in enumerate(read_lines(filename))]
+
+
+def part1(instructions: List[Instruction]) -> int:
+    """
+    The accumulator just before any instruction runs a second time.
+    """
+    console = Console(Program.compile(instructions))
+    try:
+        console.run()
+    except InfiniteLoopException:
+        return console.accumulator
+
+    raise ValueError("Program terminates without looping.")
+
+
+def part2(instructions: List[Instruction]) -> int:
+    _, acc_value = fix_corruption(instructions)
+    return acc_value
+
+
+if __name__ == "__main__":
+    chdir_to_module(__file__)
+
+    test_instructions = instructions_from_file("./minimal_input.txt")
+    assert fix_corruption(test_instructions) == (7, 8)
+    assert part1(test_instructions) == 5
+
+    console = Console(Program.compile(test_instructions))
+    while True:
+        try:
+            console.step()
+        except InfiniteLoopException:
+            break
+    assert (console.pc, console.accumulator, console.steps) == (1, 5, 7)
 
-with open("./input.txt") as f:
-    input_lines = f.read().splitlines()
+    trace: List[Tuple[int, int, int, int]] = []
+    console = Console(
+        Program.compile(test_instructions),
+        lambda *executed: trace.append(executed),
+    )
+    try:
+        console.run()
+    except InfiniteLoopException:
+        pass
+    assert [pc for pc, _, _, _ in trace] == [0, 1, 2, 6, 7, 3, 4]
 
-instructions = [parse_instruction(line, i) for i, line in enumerate(input_lines)]
-# execute_instructions(instructions, debug=True)
-brute_force_fix_corruption(instructions)
+    instructions = instructions_from_file("./input.txt")
+    # execute_instructions(instructions, debug=True)
+    changed_inst, acc_value = fix_corruption(instructions)
+    print(f"We're done! changed_inst: {changed_inst} acc: {acc_value}")
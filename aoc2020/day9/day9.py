@@ -1,4 +1,17 @@
-from typing import List, Set
+from collections import Counter, deque
+import itertools
+from typing import (
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+from aoc2020.inputs import chdir_to_module, read_ints
 
 
 def has_valid_sum(number: int, preamble: Set[int]) -> bool:
@@ -47,22 +60,268 @@ def find_encryption_weakness(numbers: List[int], window: int) -> int:
     return weakness
 
 
-with open("./minimal_input.txt") as f:
-    input_lines = f.read().splitlines()
+class RollingPreamble:
+    """
+    The last `window` numbers of a message stream, kept as a deque for order
+    plus a Counter for membership, so sliding forward is O(1).
+    """
 
-messages = [int(line) for line in input_lines]
+    def __init__(self, window: int):
+        self.window = window
+        self.order: Deque[int] = deque()
+        self.counts: Counter[int] = Counter()
 
-assert find_first_invalid_msg(messages, 5) == 127
+    @property
+    def is_full(self) -> bool:
+        return len(self.order) == self.window
 
-assert find_contiguous_range_that_sums_to(127, messages) == [15, 25, 47, 40]
-assert find_contiguous_range_that_sums_to(215, messages) == [55, 65, 95]
-assert find_contiguous_range_that_sums_to(449, messages) == [117, 150, 182]
+    def has_valid_sum(self, number: int) -> bool:
+        """
+        Whether two different entries of the window sum to number.
+        """
+        for candidate in self.counts:
+            other = number - candidate
+            if other == candidate:
+                if self.counts[candidate] > 1:
+                    return True
+            elif other in self.counts:
+                return True
+        return False
 
-assert find_encryption_weakness(messages, 5) == 62
+    def push(self, number: int) -> None:
+        self.order.append(number)
+        self.counts[number] += 1
 
-with open("./input.txt") as f:
-    input_lines = f.read().splitlines()
+        if len(self.order) > self.window:
+            oldest = self.order.popleft()
+            self.counts[oldest] -= 1
+            if not self.counts[oldest]:
+                del self.counts[oldest]
 
-messages = [int(line) for line in input_lines]
 
-print(f"Weakness: {find_encryption_weakness(messages, 25)}")
+def scan_invalid_msgs(numbers: Iterable[int], window: int) -> Iterator[int]:
+    """
+    Lazily yield every number that isn't a sum of two of the `window`
+    numbers before it.
+    """
+    preamble = RollingPreamble(window)
+    for number in numbers:
+        if preamble.is_full and not preamble.has_valid_sum(number):
+            yield number
+        preamble.push(number)
+
+
+def find_first_invalid_msg_streaming(numbers: Iterable[int], window: int) -> int:
+    for invalid_msg in scan_invalid_msgs(numbers, window):
+        return invalid_msg
+
+    raise ValueError("found no invalid msg")
+
+
+def find_contiguous_range_two_pointer(target: int, numbers: List[int]) -> List[int]:
+    """
+    Same as find_contiguous_range_that_sums_to, but by sliding both ends of
+    the range forward, which is linear as long as numbers are non-negative.
+    """
+    start = 0
+    sum_so_far = 0
+
+    for end, number in enumerate(numbers):
+        sum_so_far += number
+
+        while sum_so_far > target and start < end:
+            sum_so_far -= numbers[start]
+            start += 1
+
+        # ranges need at least two numbers
+        if sum_so_far == target and end > start:
+            return numbers[start : end + 1]
+
+    raise ValueError(f"No contiguous range sums to {target}")
+
+
+def find_encryption_weakness_streaming(numbers: List[int], window: int) -> int:
+    invalid_msg = find_first_invalid_msg_streaming(numbers, window)
+    contiguous_range = find_contiguous_range_two_pointer(invalid_msg, numbers)
+    weakness = min(contiguous_range) + max(contiguous_range)
+
+    return weakness
+
+
+class RangeIndex:
+    """
+    Prefix sums over a message stream, for answering many "which contiguous
+    range sums to target" questions against the same numbers.
+
+    Ranges come back as range objects of indices into numbers, and have at
+    least two numbers in them. min and max over a range are answered from
+    sparse tables, built the first time they're needed.
+    """
+
+    def __init__(self, numbers: Sequence[int]):
+        self.numbers = numbers
+        # prefix_sums[i] is the sum of numbers[:i]
+        self.prefix_sums = list(itertools.accumulate(numbers, initial=0))
+        self.non_negative = all(number >= 0 for number in numbers)
+        # mins[k][i] is min(numbers[i : i + 2 ** k]), and the same for maxes
+        self._mins: List[List[int]] = []
+        self._maxes: List[List[int]] = []
+
+    def _two_pointer_range(self, target: int) -> Optional[range]:
+        """
+        Slide both ends of the range forward, only valid when no number is
+        negative.
+        """
+        prefix_sums = self.prefix_sums
+        start = 0
+        for end in range(2, len(prefix_sums)):
+            while prefix_sums[end] - prefix_sums[start] > target and start < end - 2:
+                start += 1
+            if prefix_sums[end] - prefix_sums[start] == target:
+                return range(start, end)
+        return None
+
+    def find_ranges(self, targets: Iterable[int]) -> Dict[int, Optional[range]]:
+        """
+        The first-ending range summing to each target, or None where there
+        isn't one.
+
+        Without negative numbers this is a two-pointer scan per target.
+        Otherwise a single pass over the prefix sums looks up, for every
+        range end, whether prefix_sum - target was an earlier prefix sum.
+        """
+        found: Dict[int, Optional[range]] = {target: None for target in targets}
+        if self.non_negative:
+            for target in found:
+                found[target] = self._two_pointer_range(target)
+            return found
+
+        prefix_sums = self.prefix_sums
+        pending = set(found)
+        # earliest index of every prefix sum that can start a range so far
+        starts: Dict[int, int] = {}
+        for end in range(2, len(prefix_sums)):
+            if not pending:
+                break
+
+            starts.setdefault(prefix_sums[end - 2], end - 2)
+            for target in list(pending):
+                start = starts.get(prefix_sums[end] - target)
+                if start is not None:
+                    found[target] = range(start, end)
+                    pending.remove(target)
+
+        return found
+
+    def find_range(self, target: int) -> range:
+        found = self.find_ranges([target])[target]
+        if found is None:
+            raise ValueError(f"No contiguous range sums to {target}")
+        return found
+
+    def _build_sparse_tables(self) -> None:
+        mins = [list(self.numbers)]
+        maxes = [list(self.numbers)]
+        width = 1
+        while 2 * width <= len(self.numbers):
+            lower_mins, lower_maxes = mins[-1], maxes[-1]
+            num_ranges = len(lower_mins) - width
+            mins.append(list(map(min, lower_mins[:num_ranges], lower_mins[width:])))
+            maxes.append(list(map(max, lower_maxes[:num_ranges], lower_maxes[width:])))
+            width *= 2
+
+        self._mins = mins
+        self._maxes = maxes
+
+    def min_max(self, indices: range) -> Tuple[int, int]:
+        """
+        min and max of numbers over a non-empty range, in O(1) once the
+        sparse tables are built.
+        """
+        if not self._mins:
+            self._build_sparse_tables()
+
+        # two overlapping power-of-two ranges cover the whole of indices
+        level = len(indices).bit_length() - 1
+        last = indices.stop - (1 << level)
+        mins, maxes = self._mins[level], self._maxes[level]
+        return (
+            min(mins[indices.start], mins[last]),
+            max(maxes[indices.start], maxes[last]),
+        )
+
+    def weaknesses(self, targets: Iterable[int]) -> Dict[int, Optional[int]]:
+        """
+        min + max of the range summing to each target, or None where there
+        isn't one.
+        """
+        weaknesses: Dict[int, Optional[int]] = {}
+        for target, indices in self.find_ranges(targets).items():
+            if indices is None:
+                weaknesses[target] = None
+            else:
+                weaknesses[target] = sum(self.min_max(indices))
+        return weaknesses
+
+
+WINDOW = 25
+
+
+def messages_from_file(filename: str) -> List[int]:
+    return list(read_ints(filename))
+
+
+def part1(messages: List[int]) -> int:
+    return find_first_invalid_msg_streaming(messages, WINDOW)
+
+
+def part2(messages: List[int]) -> int:
+    return find_encryption_weakness_streaming(messages, WINDOW)
+
+
+if __name__ == "__main__":
+    chdir_to_module(__file__)
+
+    messages = messages_from_file("./minimal_input.txt")
+
+    assert find_first_invalid_msg(messages, 5) == 127
+
+    assert find_contiguous_range_that_sums_to(127, messages) == [15, 25, 47, 40]
+    assert find_contiguous_range_that_sums_to(215, messages) == [55, 65, 95]
+    assert find_contiguous_range_that_sums_to(449, messages) == [117, 150, 182]
+
+    assert find_encryption_weakness(messages, 5) == 62
+
+    assert find_first_invalid_msg_streaming(messages, 5) == 127
+    assert list(scan_invalid_msgs(messages, 5)) == [127]
+
+    rolling = RollingPreamble(3)
+    for number in [1, 20, 25]:
+        rolling.push(number)
+    assert has_valid_sum(40, {1, 20, 25})
+    assert not rolling.has_valid_sum(40)
+    rolling.push(20)
+    assert rolling.has_valid_sum(40)
+
+    assert find_contiguous_range_two_pointer(127, messages) == [15, 25, 47, 40]
+    assert find_contiguous_range_two_pointer(215, messages) == [55, 65, 95]
+    assert find_contiguous_range_two_pointer(449, messages) == [117, 150, 182]
+
+    assert find_encryption_weakness_streaming(messages, 5) == 62
+
+    index = RangeIndex(messages)
+    assert index.find_ranges([127, 215, 449, 1]) == {
+        127: range(2, 6),
+        215: range(7, 10),
+        449: range(11, 14),
+        1: None,
+    }
+    assert index.weaknesses([127, 215]) == {127: 62, 215: 150}
+
+    # negative numbers fall back to the prefix sum look-ups
+    mixed = RangeIndex([5, -3, 4, 10, -7, 1])
+    assert mixed.find_ranges([1, 6, 100]) == {1: range(1, 3), 6: range(0, 3), 100: None}
+
+    messages = messages_from_file("./input.txt")
+
+    print(f"Weakness: {part2(messages)}")
@@ -0,0 +1,179 @@
+"""
+Memory-mapped access to puzzle inputs.
+
+Reading a file with open(...).read().splitlines() holds the whole text, then
+a list of every line, then whatever each line gets parsed into. Mapping the
+file instead lets the OS page it in as needed, and lines, blank-line
+separated records, and integers are cut straight out of the mapping.
+"""
+
+import mmap
+import os
+from array import array
+from typing import Iterator, Optional
+
+# how much of the file to split at once when bulk parsing integers
+INT_CHUNK_SIZE = 1 << 20
+
+
+class MappedInput:
+    """
+    A puzzle input file mapped read-only into memory:
+
+        with MappedInput("input.txt") as puzzle_input:
+            for line in puzzle_input.lines():
+                ...
+
+    raw_lines() hands out memoryviews into the mapping without copying, so
+    they must not be used once the with block is over.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self._file = None
+        self._mapping: Optional[mmap.mmap] = None
+        self._view = memoryview(b"")
+
+    def __enter__(self) -> "MappedInput":
+        self._file = open(self.filename, "rb")
+        try:
+            self._mapping = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files can't be mapped
+            self._mapping = None
+        else:
+            self._view = memoryview(self._mapping)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._view.release()
+        if self._mapping is not None:
+            try:
+                self._mapping.close()
+            except BufferError:
+                # a raw line outlived the with block, the mapping goes
+                # away once the last of those views does
+                pass
+        if self._file is not None:
+            self._file.close()
+
+    def __len__(self) -> int:
+        return len(self._view)
+
+    def raw(self) -> memoryview:
+        """
+        The whole file as a view into the mapping, e.g. to run a bytes regex
+        over it.
+        """
+        return self._view
+
+    def _line_bounds(self) -> Iterator[range]:
+        mapping = self._mapping
+        if mapping is None:
+            return
+
+        start = 0
+        size = len(mapping)
+        while start < size:
+            end = mapping.find(b"\n", start)
+            if end < 0:
+                end = size
+            # match str.splitlines() on files with windows line endings
+            if end > start and mapping[end - 1] == ord("\r"):
+                yield range(start, end - 1)
+            else:
+                yield range(start, end)
+            start = end + 1
+
+    def raw_lines(self) -> Iterator[memoryview]:
+        """
+        Every line, without its line ending, as a view into the mapping.
+        """
+        for bounds in self._line_bounds():
+            yield self._view[bounds.start : bounds.stop]
+
+    def lines(self) -> Iterator[str]:
+        """
+        Same lines as str.splitlines(), decoding one line at a time.
+        """
+        for bounds in self._line_bounds():
+            yield str(self._view[bounds.start : bounds.stop], "utf-8")
+
+    def records(self) -> Iterator[str]:
+        """
+        The blank-line separated records, each with its lines joined by "\\n".
+        """
+        start: Optional[int] = None
+        end = 0
+        for bounds in self._line_bounds():
+            if bounds.start == bounds.stop:
+                if start is not None:
+                    yield str(self._view[start:end], "utf-8")
+                start = None
+            else:
+                if start is None:
+                    start = bounds.start
+                end = bounds.stop
+
+        if start is not None:
+            yield str(self._view[start:end], "utf-8")
+
+    def ints(self) -> array:
+        """
+        Every whitespace separated integer in the file, as a compact array.
+
+        The file is split a chunk at a time, so there's never more than one
+        chunk's worth of int objects alive. Entries are signed 64-bit, and a
+        ValueError names any number that doesn't fit.
+        """
+        numbers = array("q")
+        mapping = self._mapping
+        if mapping is None:
+            return numbers
+
+        start = 0
+        size = len(mapping)
+        while start < size:
+            end = start + INT_CHUNK_SIZE
+            if end < size:
+                # don't cut a number in half
+                newline = mapping.rfind(b"\n", start, end)
+                end = newline + 1 if newline >= start else mapping.find(b"\n", end)
+                if end <= 0:
+                    end = size
+            chunk = mapping[start:end].split()
+            try:
+                numbers.extend(map(int, chunk))
+            except OverflowError:
+                too_big = next(
+                    token for token in chunk if not -(2**63) <= int(token) < 2**63
+                )
+                raise ValueError(
+                    f"{too_big.decode()} doesn't fit in a 64-bit int"
+                ) from None
+            start = end
+
+        return numbers
+
+
+def chdir_to_module(module_file: str) -> None:
+    """
+    Switch to the directory holding module_file, so a day run with
+    python -m aoc2020.dayN.dayN finds its inputs wherever it's started from.
+    """
+    os.chdir(os.path.dirname(os.path.abspath(module_file)))
+
+
+def read_lines(filename: str) -> Iterator[str]:
+    with MappedInput(filename) as puzzle_input:
+        yield from puzzle_input.lines()
+
+
+def read_records(filename: str) -> Iterator[str]:
+    with MappedInput(filename) as puzzle_input:
+        yield from puzzle_input.records()
+
+
+def read_ints(filename: str) -> array:
+    with MappedInput(filename) as puzzle_input:
+        return puzzle_input.ints()
@@ -0,0 +1,170 @@
+"""
+Timed spans and hot-path counters for a day's run.
+
+A Recorder times each phase of a run (reading the input, parsing it,
+solving each part) as a span, optionally under cProfile and tracemalloc,
+and collects whatever the solvers count while it's active:
+
+    recorder = Recorder(profile=True)
+    with recorder.span("parse"):
+        ...
+    recorder.write_json("day11.json")
+
+Solvers report through the module level count() and end_round(), which do
+nothing unless a Recorder is active, so they can stay in place for normal
+runs. The profiling modules are only imported by the Recorders that use
+them, so importing this costs the solvers next to nothing.
+"""
+
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+# how many of the most expensive functions to keep from a profiled span
+PROFILE_TOP_FUNCTIONS = 15
+
+_recorder: Optional["Recorder"] = None
+
+
+def count(name: str, amount: int = 1) -> None:
+    """
+    Add to a named counter on the active Recorder, if there is one.
+    """
+    if _recorder is not None:
+        _recorder.counters[name] += amount
+
+
+def end_round(name: str) -> None:
+    """
+    Close a round for a counter, recording how much it grew since the
+    previous round, if a Recorder is active.
+    """
+    if _recorder is not None:
+        _recorder.end_round(name)
+
+
+class ProfiledFunction(NamedTuple):
+    function: str
+    calls: int
+    total_seconds: float
+    cumulative_seconds: float
+
+
+class Span(NamedTuple):
+    name: str
+    seconds: float
+    # only filled in when the Recorder traces memory
+    peak_bytes: Optional[int]
+    # only filled in when the Recorder profiles
+    profile: Optional[List[ProfiledFunction]]
+    # how much each counter grew during the span
+    counters: Dict[str, int]
+
+
+def top_functions(profile: Any, limit: int) -> List[ProfiledFunction]:
+    import pstats
+
+    stats = pstats.Stats(profile).stats  # type: ignore[attr-defined]
+    functions = [
+        ProfiledFunction(f"{filename}:{line}({name})", calls, total, cumulative)
+        for (filename, line, name), (_, calls, total, cumulative, _) in stats.items()
+    ]
+    functions.sort(key=lambda function: function.cumulative_seconds, reverse=True)
+    return functions[:limit]
+
+
+class Recorder:
+    def __init__(self, profile: bool = False, trace_memory: bool = False):
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.spans: List[Span] = []
+        self.counters: Counter = Counter()
+        # per-round growth of each counter passed to end_round
+        self.rounds: Dict[str, List[int]] = {}
+        self._round_starts: Counter = Counter()
+
+    def end_round(self, name: str) -> None:
+        total = self.counters[name]
+        self.rounds.setdefault(name, []).append(total - self._round_starts[name])
+        self._round_starts[name] = total
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """
+        Time the body as a span, with the Recorder active for count().
+        """
+        global _recorder
+        previous, _recorder = _recorder, self
+        counters_before = self.counters.copy()
+
+        profiler = None
+        if self.profile:
+            import cProfile
+
+            profiler = cProfile.Profile()
+        if self.trace_memory:
+            import tracemalloc
+
+            tracemalloc.start()
+
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            seconds = time.perf_counter() - start
+
+            peak_bytes = None
+            if self.trace_memory:
+                _, peak_bytes = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+            _recorder = previous
+
+            self.spans.append(
+                Span(
+                    name,
+                    seconds,
+                    peak_bytes,
+                    (
+                        None
+                        if profiler is None
+                        else top_functions(profiler, PROFILE_TOP_FUNCTIONS)
+                    ),
+                    dict(self.counters - counters_before),
+                )
+            )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "spans": [
+                {
+                    "name": span.name,
+                    "seconds": span.seconds,
+                    "peak_bytes": span.peak_bytes,
+                    "profile": (
+                        None
+                        if span.profile is None
+                        else [function._asdict() for function in span.profile]
+                    ),
+                    "counters": span.counters,
+                }
+                for span in self.spans
+            ],
+            "counters": dict(self.counters),
+            "rounds": self.rounds,
+        }
+
+    def write_json(self, filename: str, **extra: Any) -> None:
+        """
+        Save everything recorded, plus any extra top level fields such as
+        the day, so runs can be compared later.
+        """
+        import json
+
+        with open(filename, "w") as f:
+            json.dump({**extra, **self.to_dict()}, f, indent=2)
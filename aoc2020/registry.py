@@ -0,0 +1,86 @@
+"""
+Where to find the solver for each day.
+
+Solver modules are only imported when a day is actually run, so looking
+something up here doesn't pay for attr, re, or any of the other days.
+"""
+
+import importlib
+import os
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+
+class DaySolver(NamedTuple):
+    # dotted path of the module holding the solver
+    module: str
+    # function turning an input file name into the parsed puzzle input,
+    # which may be a dotted path to a classmethod
+    parse: str
+    # mapping from part number to the function solving it from parsed input
+    parts: Dict[int, str]
+    # same, for slower reference solutions kept around for comparison
+    reference_parts: Optional[Dict[int, str]] = None
+
+    def load(self, name: str) -> Callable:
+        found: Any = importlib.import_module(self.module)
+        for attribute in name.split("."):
+            found = getattr(found, attribute)
+        return found
+
+    def load_parse(self) -> Callable[[str], Any]:
+        return self.load(self.parse)
+
+    def load_part(self, part: int, reference: bool = False) -> Callable[[Any], Any]:
+        if reference:
+            if part not in (self.reference_parts or {}):
+                raise ValueError(
+                    f"No reference solver for part {part} in {self.module}"
+                )
+            return self.load(self.reference_parts[part])  # type: ignore[index]
+
+        if part not in self.parts:
+            raise ValueError(f"No solver for part {part} in {self.module}")
+        return self.load(self.parts[part])
+
+
+REGISTRY: Dict[int, DaySolver] = {
+    1: DaySolver("aoc2020.day1.day1", "expenses_from_file", {1: "part1", 2: "part2"}),
+    2: DaySolver(
+        "aoc2020.day2.day2", "password_text_from_file", {1: "part1", 2: "part2"}
+    ),
+    3: DaySolver("aoc2020.day3.day3", "slope_map_from_file", {1: "part1", 2: "part2"}),
+    4: DaySolver(
+        "aoc2020.day4.day4", "passport_records_from_file", {1: "part1", 2: "part2"}
+    ),
+    5: DaySolver(
+        "aoc2020.day5.day5", "seat_id_array_from_file", {1: "part1", 2: "part2"}
+    ),
+    6: DaySolver(
+        "aoc2020.day6.day6", "answer_lines_from_file", {1: "part1", 2: "part2"}
+    ),
+    7: DaySolver("aoc2020.day7.day7", "BagGraph.from_file", {1: "part1", 2: "part2"}),
+    8: DaySolver(
+        "aoc2020.day8.day8", "instructions_from_file", {1: "part1", 2: "part2"}
+    ),
+    9: DaySolver("aoc2020.day9.day9", "messages_from_file", {1: "part1", 2: "part2"}),
+    10: DaySolver(
+        "aoc2020.day10.day10", "adapters_for_input_file", {1: "part1", 2: "part2"}
+    ),
+    11: DaySolver(
+        "aoc2020.day11.day11",
+        "Ferry.from_input_file",
+        {1: "part1", 2: "part2"},
+        {1: "reference_part1", 2: "reference_part2"},
+    ),
+    12: DaySolver("aoc2020.day12.day12", "commands_from_file", {2: "part2"}),
+}
+
+
+def get_solver(day: int) -> DaySolver:
+    if day not in REGISTRY:
+        raise ValueError(f"No solver registered for day {day}")
+    return REGISTRY[day]
+
+
+def default_input_path(day: int) -> str:
+    return os.path.join(os.path.dirname(__file__), f"day{day}", "input.txt")
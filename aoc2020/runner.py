@@ -0,0 +1,185 @@
+"""
+Run every registered day and part at once, each in its own process.
+
+    python -m aoc2020 all [--workers 4] [--timeout 30]
+
+Each task gets a worker process of its own, at most `workers` at a time, so
+a solver that runs past its timeout can be killed without taking anything
+else down with it.
+"""
+
+import multiprocessing
+import os
+import time
+import traceback
+from multiprocessing.connection import Connection, wait
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from aoc2020.registry import REGISTRY, default_input_path, get_solver
+
+
+class Task(NamedTuple):
+    day: int
+    part: int
+    input_path: str
+
+
+class TaskResult(NamedTuple):
+    task: Task
+    answer: Optional[str]
+    parse_seconds: Optional[float]
+    solve_seconds: Optional[float]
+    error: Optional[str] = None
+
+
+def all_tasks() -> List[Task]:
+    return [
+        Task(day, part, default_input_path(day))
+        for day, solver in sorted(REGISTRY.items())
+        for part in sorted(solver.parts)
+    ]
+
+
+def solve_task(task: Task, conn: Connection) -> None:
+    """
+    Worker process body, sends back (answer, parse_seconds, solve_seconds)
+    or the formatted exception.
+    """
+    result: Any
+    try:
+        solver = get_solver(task.day)
+        parse = solver.load_parse()
+        solve = solver.load_part(task.part)
+
+        start = time.perf_counter()
+        puzzle_input = parse(task.input_path)
+        parse_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        answer = solve(puzzle_input)
+        solve_seconds = time.perf_counter() - start
+
+        result = (str(answer), parse_seconds, solve_seconds)
+    except Exception:
+        result = traceback.format_exc(limit=-1).strip().splitlines()[-1]
+
+    conn.send(result)
+    conn.close()
+
+
+class RunningTask(NamedTuple):
+    task: Task
+    process: Any
+    conn: Connection
+    deadline: float
+
+
+def run_tasks(
+    tasks: List[Task], workers: Optional[int] = None, timeout: float = 60.0
+) -> List[TaskResult]:
+    """
+    Run the tasks on up to `workers` processes, killing any that take
+    longer than `timeout` seconds. Results come back in the order of tasks.
+    """
+    workers = workers or os.cpu_count() or 1
+    context = multiprocessing.get_context()
+
+    pending = list(reversed(tasks))
+    running: Dict[Connection, RunningTask] = {}
+    results: Dict[Task, TaskResult] = {}
+
+    def finish(running_task: RunningTask, result: TaskResult) -> None:
+        del running[running_task.conn]
+        running_task.conn.close()
+        running_task.process.join()
+        results[running_task.task] = result
+
+    try:
+        while pending or running:
+            while pending and len(running) < workers:
+                task = pending.pop()
+                receiver, sender = context.Pipe(duplex=False)
+                process = context.Process(
+                    target=solve_task, args=(task, sender), daemon=True
+                )
+                process.start()
+                # only the worker should hold the sending end, so a worker
+                # that dies shows up as the pipe closing
+                sender.close()
+                running[receiver] = RunningTask(
+                    task, process, receiver, time.monotonic() + timeout
+                )
+
+            next_deadline = min(r.deadline for r in running.values())
+            ready = wait(
+                list(running), timeout=max(0.0, next_deadline - time.monotonic())
+            )
+
+            for conn in ready:
+                running_task = running[conn]  # type: ignore[index]
+                try:
+                    received = running_task.conn.recv()
+                except EOFError:
+                    received = "worker exited without an answer"
+
+                if isinstance(received, tuple):
+                    answer, parse_seconds, solve_seconds = received
+                    result = TaskResult(
+                        running_task.task, answer, parse_seconds, solve_seconds
+                    )
+                else:
+                    result = TaskResult(running_task.task, None, None, None, received)
+                finish(running_task, result)
+
+            now = time.monotonic()
+            for running_task in list(running.values()):
+                if running_task.deadline <= now:
+                    running_task.process.kill()
+                    finish(
+                        running_task,
+                        TaskResult(
+                            running_task.task,
+                            None,
+                            None,
+                            None,
+                            f"timed out after {timeout:g} s",
+                        ),
+                    )
+    finally:
+        # interrupted, don't leave any solvers running in the background
+        for running_task in running.values():
+            running_task.process.kill()
+            running_task.process.join()
+
+    return [results[task] for task in tasks]
+
+
+def format_ms(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return f"{'-':>13}"
+    return f"{seconds * 1000:10.2f} ms"
+
+
+def print_summary(results: List[TaskResult]) -> None:
+    print(f"{'day':>3} {'part':>4}  {'parse':>13}  {'solve':>13}  answer")
+    for result in results:
+        outcome = result.answer if result.error is None else f"FAILED: {result.error}"
+        print(
+            f"{result.task.day:>3} {result.task.part:>4}"
+            f"  {format_ms(result.parse_seconds)}  {format_ms(result.solve_seconds)}"
+            f"  {outcome}"
+        )
+
+    failures = sum(result.error is not None for result in results)
+    print(f"{len(results) - failures} passed, {failures} failed")
+
+
+def run_all(workers: Optional[int] = None, timeout: float = 60.0) -> bool:
+    """
+    Run and summarise every registered day, returning whether they all passed.
+    """
+    start = time.perf_counter()
+    results = run_tasks(all_tasks(), workers, timeout)
+    print_summary(results)
+    print(f"total {format_ms(time.perf_counter() - start).strip()}")
+    return all(result.error is None for result in results)